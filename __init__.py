@@ -1,19 +1,37 @@
-from maya import cmds, mel, OpenMayaUI
-from PySide2 import QtWidgets
-from shiboken2 import wrapInstance
-from functools import partial
+from maya import cmds, mel
+import re
+import os
+import json
+import importlib
+import pkgutil
 from .utils import resetSelectedMayaCtrlsTransforms, toggleJointsLocalAxis
+from .skin import SkinWeights, SkinIndex, SKIN_CLUSTER_ATTRIBUTES, export_weights, import_weights, \
+    get_selection_influences
+from .modifiers import AttributeWriter
+from .profiling import Stopwatch, Instrumentation, profile_playback
+from .viewport import ModelPanels
+from .controllers import ControllerRegistry, NO_CONTROLLERS_WARNING, get_namespace
+from .progress import Progress
+from .display import set_geometry_lock, get_geometry_overrides, JointDisplay
+from .transforms import create_offset_groups
+from .spatial import get_selection_points, get_frame, create_locators
+from .dispatch import ActionDispatcher, ACTIONS_PATH, load_actions
+from .metadata import get_metadata, set_metadata, get_fingerprint
+from .launchers import PluginLoader, WindowCache
 
 class Chunk(object):
 
     def __init__(self, name=''):
         self.name = str(name)
+        self.record = Instrumentation.record(self.name)
 
     def __enter__(self):
+        self.record.__enter__()
         cmds.undoInfo(openChunk=True, chunkName=self.name)
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         cmds.undoInfo(closeChunk=True)
+        self.record.__exit__(exc_type, exc_val, exc_tb)
 
 
 def chunk(func):
@@ -36,72 +54,122 @@ class RigUtils(object):
         else:
             cmds.warning('You should be using the Move Tool to be proceed.')
 
+    @classmethod
+    @chunk
+    def locators_on_selection(cls, mode='center'):
+        """
+        Create a locator per selected object, or per object of the selected components.
+        :param mode: str, 'center', 'bottom', 'centroid' or 'pca' (oriented along the points principal axes)
+        :return:
+        """
+        items = get_selection_points()
+
+        if items:
+            create_locators([get_frame(points, mode=mode) for _, points in items])
+        else:
+            cmds.warning('Please select objects or components to place locators on.')
+
     @classmethod
     def get_skinned_joints(cls, mesh):
         joints = list()
-        skin_clusters = [n for n in cmds.listHistory(mesh) or list() if cmds.objectType(n, isAType='skinCluster')]
-        for skin_cluster in skin_clusters:
-            joints += cmds.skinCluster(skin_cluster, query=True, inf=True) or list()
+        for skin_cluster in SkinIndex.get_skin_clusters(mesh):
+            joints += SkinIndex.get_influences(skin_cluster)
         joints = list(set(joints))
         joints.sort()
         return joints
 
     @classmethod
     @chunk
-    def select_skinned_joints(cls):
-        joints = list()
-        for node in cmds.ls(sl=True) or list():
-            joints += cls.get_skinned_joints(node)
+    def select_skinned_joints(cls, batch_size=5000):
+        joints = get_selection_influences()
         if joints:
-            joints = list(set(joints))
-            joints.sort()
-            cmds.select(joints)
+            cmds.select(clear=True)
+            for start in range(0, len(joints), batch_size):
+                cmds.select(joints[start:start + batch_size], add=True)
 
     @classmethod
     def get_skin_cluster(cls, mesh):
-        for node in cmds.listHistory(mesh) or list():
-            if cmds.objectType(node, isAType='skinCluster'):
-                return node
-        return None
+        skin_clusters = SkinIndex.get_skin_clusters(mesh)
+        return skin_clusters[0] if skin_clusters else None
 
     @classmethod
     @chunk
     def transfer_skin(cls):
-        attributes = (
-            'skinningMethod', 'useComponents', 'deformUserNormals', 'dqsSupportNonRigid',
-            'dqsScaleX', 'dqsScaleY', 'dqsScaleZ', 'normalizeWeights', 'weightDistribution',
-            'maintainMaxInfluences', 'maxInfluences', 'envelope'
-        )
         selection = cmds.ls(sl=True) or list()
         if len(selection) > 1:
             parent = selection[0]
             children = selection[1:]
 
             parent_skin_cluster = cls.get_skin_cluster(parent)
+            if not parent_skin_cluster:
+                cmds.warning('The mesh \'{0}\' is not skinned.'.format(parent))
+                return
 
             data = list()
-            for attr in attributes:
+            for attr in SKIN_CLUSTER_ATTRIBUTES:
                 data.append((attr, cmds.getAttr('{0}.{1}'.format(parent_skin_cluster, attr))))
 
+            # Read source weights once for every child
+            source_weights = SkinWeights(parent_skin_cluster)
+            if not source_weights.is_mesh:
+                cmds.warning('The skin of \'{0}\' can\'t be sampled, it is not a mesh.'.format(parent))
+                return
+
             joints = cls.get_skinned_joints(parent)
-            for child in children:
+
+            # Resolve every child skinCluster first, each skinCluster created below invalidates the index
+            child_skin_clusters = [cls.get_skin_cluster(child) for child in children]
+
+            new_skin_clusters = list()
+            for child, child_skin_cluster in zip(children, child_skin_clusters):
                 # Wipe out any previous skinCluster on dest mesh
-                if True in [cmds.objectType(node, isAType='skinCluster') for node in cmds.listHistory(child) or list()]:
+                if child_skin_cluster:
                     cmds.skinCluster(child, e=True, unbind=True)
 
                 # Skin dest mesh with joints' meshes
                 new_skin_cluster, = cmds.skinCluster(child, joints)
+                new_skin_clusters.append(new_skin_cluster)
 
-                for attr, value in data:
-                    cmds.setAttr('{0}.{1}'.format(new_skin_cluster, attr), value)
+            with AttributeWriter() as writer:
+                for new_skin_cluster in new_skin_clusters:
+                    for attr, value in data:
+                        writer.set('{0}.{1}'.format(new_skin_cluster, attr), value)
 
-                # Transfer the skin
-                cmds.copySkinWeights(parent, child, noMirror=True, surfaceAssociation='closestPoint', influenceAssociation=('name', 'closestJoint'))
+            # Transfer the skin
+            for new_skin_cluster in new_skin_clusters:
+                source_weights.transfer(new_skin_cluster)
         else:
             cmds.warning('Two meshes should be at least selected.')
 
         cmds.select(selection)
 
+    @classmethod
+    def export_skin_weights(cls):
+        selection = cmds.ls(sl=True) or list()
+        skin_cluster = cls.get_skin_cluster(selection[0]) if selection else None
+        if not skin_cluster:
+            cmds.warning('Please select a skinned mesh.')
+            return
+
+        file_paths = cmds.fileDialog2(fileFilter='Skin Weights (*.skw)', dialogStyle=2, fileMode=0)
+        if file_paths:
+            vertex_count = export_weights(skin_cluster, file_paths[0])
+            print('{0} vertices of \'{1}\' written to \'{2}\'.'.format(vertex_count, skin_cluster, file_paths[0]))
+
+    @classmethod
+    @chunk
+    def import_skin_weights(cls):
+        selection = cmds.ls(sl=True) or list()
+        if not selection:
+            cmds.warning('Please select at least one mesh.')
+            return
+
+        file_paths = cmds.fileDialog2(fileFilter='Skin Weights (*.skw)', dialogStyle=2, fileMode=1)
+        if file_paths:
+            for mesh in selection:
+                import_weights(mesh, file_paths[0])
+            cmds.select(selection)
+
     @classmethod
     @chunk
     def scale_joints_up(cls):
@@ -116,31 +184,34 @@ class RigUtils(object):
         new = current * 0.75
         cmds.jointDisplayScale(new)
 
+    @classmethod
+    @chunk
+    def scale_character_joints(cls, factor):
+        joints = JointDisplay.get_target_joints()
+        if joints:
+            JointDisplay.scale_radius(joints, factor)
+
+    @classmethod
+    @chunk
+    def toggle_joints_draw_style(cls):
+        joints = JointDisplay.get_target_joints()
+        if not joints:
+            cmds.warning('No joints found.')
+            return
+
+        # Toggle between Bone and None
+        draw_style = 2 if cmds.getAttr('{0}.drawStyle'.format(joints[0])) == 0 else 0
+        JointDisplay.set_draw_style(joints, draw_style)
+
     @classmethod
     @chunk
     def toggle_ctrls_visibility(cls):
-        for index in range(10):
-            panel = 'modelPanel{0}'.format(index)
-            try:
-                if cmds.modelEditor(panel, q=True, nc=True):
-                    cmds.modelEditor(panel, e=True, nc=False)
-                else:
-                    cmds.modelEditor(panel, e=True, nc=True)
-            except:
-                continue
+        ModelPanels.toggle('nc')
 
     @classmethod
     @chunk
     def toggle_joints_visibility(cls):
-        for index in range(10):
-            panel = 'modelPanel{0}'.format(index)
-            try:
-                if cmds.modelEditor(panel, q=True, j=True):
-                    cmds.modelEditor(panel, e=True, jx=False, j=False)
-                else:
-                    cmds.modelEditor(panel, e=True, jx=True, j=True)
-            except:
-                continue
+        ModelPanels.toggle('j', 'jx')
 
     # @classmethod
     # @chunk
@@ -167,34 +238,49 @@ class RigUtils(object):
     @classmethod
     @chunk
     def toggle_wireframe(cls):
-        for index in range(10):
-            panel = 'modelPanel{0}'.format(index)
-            try:
-                if cmds.modelEditor(panel, q=True, wos=True):
-                    cmds.modelEditor(panel, e=True, wos=False)
-                else:
-                    cmds.modelEditor(panel, e=True, wos=True)
-            except:
-                continue
+        ModelPanels.toggle('wos')
+
+    @classmethod
+    def get_non_unique_nodes(cls):
+        """
+        Group every DAG path of the scene by short name in a single pass.
+        :return: dict, short name -> full paths, only for names used more than once
+        """
+        paths = dict()
+        for path in cmds.ls(dag=True, long=True) or list():
+            paths.setdefault(path.rsplit('|', 1)[-1], list()).append(path)
+        return {name: nodes for name, nodes in paths.items() if len(nodes) > 1}
+
+    @classmethod
+    def write_non_unique_nodes(cls, file_path, report=None):
+        report = cls.get_non_unique_nodes() if report is None else report
+        with open(file_path, 'w') as f:
+            for name in sorted(report):
+                f.write('{0}\t{1}\n'.format(name, len(report[name])))
+                for path in report[name]:
+                    f.write('\t{0}\n'.format(path))
+        return report
 
     @classmethod
     def print_non_unique_nodes(cls):
-        nodes = list()
-        not_unique = list()
-        for node in cmds.ls(dag=True, shortNames=True) or list():
-            node = node.split('|')[-1]
-            if not node in nodes:
-                nodes.append(node)
-            else:
-                not_unique.append(node)
+        report = cls.get_non_unique_nodes()
 
-        if not_unique:
-            for node in not_unique:
-                print(node)
+        if report:
+            for name in sorted(report):
+                print('{0} ({1})'.format(name, len(report[name])))
             cmds.warning('Your scene contains non-unique node names.')
         else:
             cmds.warning('Your scene is clear.')
 
+    @classmethod
+    def export_non_unique_nodes(cls):
+        file_paths = cmds.fileDialog2(fileFilter='Text (*.txt)', dialogStyle=2, fileMode=0)
+        if not file_paths:
+            return
+
+        report = cls.write_non_unique_nodes(file_paths[0])
+        cmds.warning('{0} non-unique names written to \'{1}\'.'.format(len(report), file_paths[0]))
+
     @classmethod
     def print_selection(cls):
         s = '('
@@ -219,12 +305,60 @@ class RigUtils(object):
     @classmethod
     @chunk
     def select_ctrls(cls):
-        from xi.project_utils.utils import mayaUtils
+        ctrls = ControllerRegistry.get_all(namespace=None)
+
+        if not ctrls:
+            cmds.warning(NO_CONTROLLERS_WARNING)
+            return
+
+        cmds.select(ctrls)
+
+    @classmethod
+    def print_instrumentation(cls):
+        Instrumentation.report()
+
+    @classmethod
+    def export_instrumentation(cls):
+        file_paths = cmds.fileDialog2(fileFilter='JSON (*.json)', dialogStyle=2, fileMode=0)
+        if file_paths:
+            Instrumentation.dump(file_paths[0])
+
+    @classmethod
+    def profile_rig(cls, set_baseline=False):
+        """
+        Measure the rig frame rate over the playback range and the evaluation cost of its skinClusters and ctrls.
+        The first profile, or one run with set_baseline, is stored on the scene as the baseline the next ones are
+        compared to. The report is written as JSON next to the scene.
+        :param set_baseline: bool
+        :return: dict, the report
+        """
+        metadata_key = 'profileBaseline'
 
-        def select_ctrls():
-            cmds.select(mayaUtils.Ctrl.get_all(namespace=None))
+        start = cmds.playbackOptions(q=True, minTime=True)
+        end = cmds.playbackOptions(q=True, maxTime=True)
+        nodes = SkinIndex.get_all() + ControllerRegistry.get_all()
+        report = profile_playback(start, end, nodes=[node.rpartition('|')[-1] for node in nodes])
 
-        select_ctrls()
+        baseline = get_metadata(metadata_key)
+        if baseline is None or set_baseline:
+            set_metadata(metadata_key, report)
+        else:
+            report['baseline'] = baseline
+            report['fps_change'] = (report['fps'] - baseline['fps']) / baseline['fps'] * 100.0 if baseline['fps'] else 0.0
+
+        scene = cmds.file(q=True, sceneName=True)
+        directory = os.path.dirname(scene) if scene else cmds.internalVar(userTmpDir=True)
+        name = os.path.splitext(os.path.basename(scene))[0] if scene else 'untitled'
+        file_path = os.path.join(directory, '{0}_profile.json'.format(name))
+        with open(file_path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+        message = '# {0:.1f} fps over frames {1} to {2}'.format(report['fps'], start, end)
+        if 'fps_change' in report:
+            message += ', {0:+.1f}% from the baseline ({1:.1f} fps)'.format(report['fps_change'], baseline['fps'])
+        print('{0}. Report written to \'{1}\'.'.format(message, file_path))
+
+        return report
 
     @classmethod
     def node_editor(cls):
@@ -236,18 +370,34 @@ class RigUtils(object):
 
     @classmethod
     def ng_skin_tools2(cls):
-        import ngSkinTools2
-        ngSkinTools2.open_ui()
+        ngSkinTools2 = PluginLoader.load('ngSkinTools2')
+        WindowCache.show('ngSkinTools2', ngSkinTools2.open_ui)
+
+    @classmethod
+    def get_global_local_indices(cls, pattern='*'):
+        """
+        Find the indices already used by global/local hierarchies in one pass over the scene.
+        :param pattern: str, id pattern
+        :return: dict, id -> set of indices
+        """
+        indices = dict()
+        for node in cmds.ls('{0}_global_C*_ctl'.format(pattern)) or list():
+            match = re.match(r'^(.+)_global_C(\d+)_ctl$', node.rpartition('|')[-1])
+            if match:
+                indices.setdefault(match.group(1), set()).add(int(match.group(2)))
+        return indices
 
     @classmethod
     @chunk
-    def create_global_local_ctrls(cls, position=(0, 0, 0), rotation=(0, 0, 0), id_='default', index=0, radius=1):
-        global_ctrl_name = '{0}_global_C{1}_ctl'.format(id_, index)
-        while cmds.objExists(global_ctrl_name):
+    def create_global_local_ctrls(cls, position=(0, 0, 0), rotation=(0, 0, 0), id_='default', index=0, radius=1, used_indices=None):
+        if used_indices is None:
+            used_indices = cls.get_global_local_indices(id_).get(id_, set())
+        while index in used_indices:
             index += 1
-            global_ctrl_name = '{0}_global_C{1}_ctl'.format(id_, index)
+        used_indices.add(index)
 
         # Create hierarchy
+        global_ctrl_name = '{0}_global_C{1}_ctl'.format(id_, index)
         global_ctrl, = cmds.circle(name=global_ctrl_name, ch=False, normal=(0, 1, 0), radius=radius * 1.2)
 
         global_ctrl_srt_name = '{0}_global_C{1}_srt'.format(id_, index)
@@ -269,24 +419,20 @@ class RigUtils(object):
         cmds.xform(global_ctrl_srt, rotation=rotation)
 
         # clean ctrls
-        for ctrl, color in ((global_ctrl, 6), (local_ctrl, 18)):
-            ctrl_shape = ctrl + 'Shape'
-            cmds.setAttr('{0}.{1}'.format(ctrl_shape, 'overrideEnabled'), True)
-            cmds.setAttr('{0}.{1}'.format(ctrl_shape, 'overrideColor'), color)
+        with AttributeWriter() as writer:
+            for ctrl, color in ((global_ctrl, 6), (local_ctrl, 18)):
+                ctrl_shape = ctrl + 'Shape'
+                writer.set('{0}.{1}'.format(ctrl_shape, 'overrideEnabled'), True)
+                writer.set('{0}.{1}'.format(ctrl_shape, 'overrideColor'), color)
+        for ctrl in (global_ctrl, local_ctrl):
             cmds.setAttr('{0}.{1}'.format(ctrl, 'visibility'), lock=True, keyable=False)
 
         return global_ctrl, local_ctrl, local_joint
 
     @classmethod
-    @chunk
-    def create_global_local_ctrls_from_selection(cls, bottom=False):
-        selection = cmds.ls(sl=True)
-
-        if not selection:
-            return
-
-        # Fetch selection bounding box
-        bounding_box = cmds.exactWorldBoundingBox(selection)
+    def get_global_local_placement(cls, nodes, bottom=False):
+        # Fetch nodes bounding box
+        bounding_box = cmds.exactWorldBoundingBox(nodes)
         pa = bounding_box[:3]
         pb = bounding_box[3:]
 
@@ -309,45 +455,150 @@ class RigUtils(object):
         distance_z = abs(pa[2] - pb[2])
         radius = max((distance_x, distance_z)) * .7
 
-        # Get selection id
-        id_ = selection[0].split('_')[0]
+        # Get nodes id
+        id_ = nodes[0].rpartition('|')[-1].split('_')[0]
         id_ = id_[0].lower() + id_[1:]
 
+        return mid_point, radius, id_
+
+    @classmethod
+    def get_global_local_meshes(cls, nodes):
+        """
+        Find the meshes under the given nodes with their skinCluster. Every bind invalidates SkinIndex, so the
+        skinClusters of a batch have to be resolved before binding anything.
+        :param nodes: list
+        :return: list of (mesh, skinCluster or None) tuples
+        """
+        items = [node.split('.')[0] for node in nodes]
+        descendents = cmds.listRelatives(items, allDescendents=True, type='mesh', fullPath=True) or list()
+        meshes = set(cmds.ls(items + descendents, type='mesh', noIntermediate=True, long=True) or list())
+        return [(mesh, cls.get_skin_cluster(mesh)) for mesh in sorted(meshes)]
+
+    @classmethod
+    def skin_to_global_local(cls, nodes, local_joint, meshes=None):
+        """
+        Bind the meshes under the given nodes to the local joint, adding it to their skinCluster if they have one.
+        :param nodes: list
+        :param local_joint: str
+        :param meshes: list, the result of get_global_local_meshes if already resolved
+        :return:
+        """
+        if meshes is None:
+            meshes = cls.get_global_local_meshes(nodes)
+
+        for mesh, skin_cluster in meshes:
+            if skin_cluster:
+                cmds.skinCluster(skin_cluster, e=True, addInfluence=local_joint)
+            else:
+                cmds.skinCluster(mesh, local_joint)
+
+    @classmethod
+    @chunk
+    def create_global_local_ctrls_from_selection(cls, bottom=False):
+        selection = cmds.ls(sl=True)
+
+        if not selection:
+            return
+
+        mid_point, radius, id_ = cls.get_global_local_placement(selection, bottom=bottom)
+        meshes = cls.get_global_local_meshes(selection)
+
         # Create hierarchy
         _, _, local_joint = cls.create_global_local_ctrls(position=mid_point, rotation=(0, 0, 0), id_=id_, index=0, radius=radius)
 
         #Skin
-        meshes = list()
-        for item in selection:
-            item = item.split('.')[0]
-            descendents = cmds.listRelatives(item, allDescendents=True) or list()
-            for child in descendents + [item]:
-                if cmds.objectType(child, isAType='mesh'):
-                    if cmds.getAttr('{0}.{1}'.format(child, 'intermediateObject')) is False:
-                        meshes.append(child)
-        meshes = list(set(meshes))
-
-        for mesh in meshes:
-            skin_cluster = cls.get_skin_cluster(mesh)
-            if skin_cluster:
-                cmds.skinCluster(skin_cluster, e=True, addInfluence=local_joint)
+        cls.skin_to_global_local(selection, local_joint, meshes=meshes)
+
+        cmds.select(selection)
+
+    @classmethod
+    @chunk
+    def create_global_local_ctrls_from_groups(cls, groups=None, bottom=False):
+        """
+        Create a global/local hierarchy per group, in one undo chunk.
+        :param groups: list, the selected nodes or, if nothing is selected, the children of 'geometry' if None
+        :param bottom: bool, place the ctrls at the bottom of each group
+        :return:
+        """
+        selection = cmds.ls(sl=True) or list()
+        geo_grp = 'geometry'
+
+        if groups is None:
+            if selection:
+                groups = selection
+            elif cmds.objExists(geo_grp):
+                groups = cmds.listRelatives(geo_grp, children=True, type='transform', fullPath=True) or list()
             else:
-                cmds.skinCluster(mesh, local_joint)
+                groups = list()
+
+        if not groups:
+            cmds.warning('No group to create global/local ctrls for.')
+            return
+
+        # Compute every placement, the free indices and the skinClusters before creating anything
+        placements = [cls.get_global_local_placement([group], bottom=bottom) for group in groups]
+        meshes = [cls.get_global_local_meshes([group]) for group in groups]
+        used_indices = cls.get_global_local_indices()
+
+        for group, (mid_point, radius, id_), group_meshes in zip(groups, placements, meshes):
+            _, _, local_joint = cls.create_global_local_ctrls(
+                position=mid_point, rotation=(0, 0, 0), id_=id_, index=0, radius=radius,
+                used_indices=used_indices.setdefault(id_, set())
+            )
+            cls.skin_to_global_local([group], local_joint, meshes=group_meshes)
 
         cmds.select(selection)
 
+    @classmethod
+    def get_set_members(cls, object_set):
+        members = set(cmds.sets(object_set, q=True) or list())
+
+        # Split the nested sets out in one query per set
+        object_sets = set(cmds.ls(list(members), type='objectSet') or list()) if members else set()
+        members -= object_sets
+        for member in object_sets:
+            members.update(cls.get_set_members(member))
+        return members
+
+    @classmethod
+    def audit_control_sets(cls, control_sets=None):
+        """
+        Compare control sets with the controllers of their namespace, without touching the selection.
+        :param control_sets: list, every ControlSet of the scene and its references if None
+        :return: dict, set -> {'missing': controllers not in the set, 'extra': members not being controllers}
+        """
+        if control_sets is None:
+            control_sets = cmds.ls('ControlSet', recursive=True, type='objectSet') or list()
+
+        # Every member would be reported as extra
+        if control_sets and not ControllerRegistry.get_all():
+            cmds.warning(NO_CONTROLLERS_WARNING)
+
+        report = dict()
+        for control_set in control_sets:
+            members = cls.get_set_members(control_set)
+            ctrls = set(ControllerRegistry.get_all(namespace=get_namespace(control_set)))
+            report[control_set] = {
+                'missing': sorted(ctrls - members),
+                'extra': sorted(members - ctrls),
+            }
+        return report
+
     @classmethod
     def compare_control_set_to_all_ctrls(cls):
-        from xi.project_utils.utils import mayaUtils
+        report = cls.audit_control_sets()
 
-        cmds.select('ControlSet')
-        control_set_members = set(cmds.ls(sl=True) or list())
+        if not report:
+            cmds.warning('No \'ControlSet\' found.')
+            return
 
-        ctrls = {str(ctrl) for ctrl in mayaUtils.Ctrl.get_all()}
-        print len(control_set_members), len(ctrls)
-        for ctrl in ctrls:
-            if ctrl not in control_set_members:
-                print(ctrl)
+        for control_set, diff in sorted(report.items()):
+            print('# {0}: {1} missing controller(s), {2} member(s) not being controllers.'.format(
+                control_set, len(diff['missing']), len(diff['extra'])))
+            for ctrl in diff['missing']:
+                print('missing: {0}'.format(ctrl))
+            for member in diff['extra']:
+                print('extra: {0}'.format(member))
 
     @classmethod
     def create_mesh_attribute(cls):
@@ -374,10 +625,11 @@ class RigUtils(object):
 
     @classmethod
     def bs_controls(cls):
-        from bsControls import bs_controlsUI
-        bs_controlsUI.BSControlsUI().bsControlsUI()
+        bs_controlsUI = PluginLoader.load('bsControls.bs_controlsUI')
+        WindowCache.show('bsControls', lambda: bs_controlsUI.BSControlsUI().bsControlsUI())
 
     @classmethod
+    @chunk
     def unlock_modeling(cls):
         geo_grp = 'geometry'
 
@@ -385,20 +637,11 @@ class RigUtils(object):
             cmds.warning('The group \'{}\' hasnt been found.'.format(geo_grp))
             return
 
-        geo_grp_descendents = cmds.listRelatives(geo_grp, allDescendents=True, type=('transform', 'mesh')) or list()
-
-        for node in geo_grp_descendents + [geo_grp]:
-            try:
-                cmds.setAttr(node + '.overrideEnabled', False)
-                cmds.setAttr(node + '.overrideDisplayType', False)
-            except:
-                cmds.warning('Unable to unset override to \'{}\'.'.format(node))
-            # setAttr "head_C0_geo.overrideEnabled" 1;
-            # setAttr "head_C0_geo.overrideDisplayType" 2;
-            # setAttr "head_C0_geo.overrideDisplayType" 0;
-            # setAttr "head_C0_geo.overrideEnabled" 0;
+        count, cancelled = set_geometry_lock(geo_grp, False)
+        print('{0} node(s) unlocked{1}.'.format(count, ', cancelled before the end' if cancelled else ''))
 
     @classmethod
+    @chunk
     def lock_modeling(cls):
         geo_grp = 'geometry'
 
@@ -406,34 +649,124 @@ class RigUtils(object):
             cmds.warning('The group \'{}\' hasnt been found.'.format(geo_grp))
             return
 
-        cmds.setAttr(geo_grp + '.overrideEnabled', True)
-        cmds.setAttr(geo_grp + '.overrideDisplayType', 2)
+        count, cancelled = set_geometry_lock(geo_grp, True)
+        print('{0} node(s) locked{1}.'.format(count, ', cancelled before the end' if cancelled else ''))
+
+    @classmethod
+    def get_lock_rig_stages(cls):
+        """
+        Stages of lock_rig as (name, inputs getter, function, fingerprinted) tuples. A stage that isn't fingerprinted
+        runs whenever it has inputs.
+        :return: tuple
+        """
+        return (
+            ('lock_all_vis_attrs_on_ctrls', cls.get_ctrls, cls.lock_all_vis_attrs_on_ctrls, True),
+            ('lock_modeling', cls.get_modeling_state, cls.lock_modeling, True),
+            ('remove_all_ng_skin_tools2', cls.get_ng_skin_tools2_nodes, cls.remove_all_ng_skin_tools2, True),
+            # Unused influences depend on the weights, fingerprinting them would cost as much as the stage itself
+            ('optimize_skin_clusters', cls.get_skin_clusters_influences, cls.optimize_skin_clusters, False),
+            ('delete_unused_nodes', cls.get_all_nodes, cls.delete_unused_nodes, True),
+        )
 
     @classmethod
-    def lock_rig(cls):
-        cls.lock_all_vis_attrs_on_ctrls()
-        cls.lock_modeling()
-        cls.remove_all_ng_skin_tools2()
-        cls.optimize_skin_clusters()
-        cls.delete_unused_nodes()
+    def lock_rig(cls, dry_run=False, force=False):
+        """
+        Run each stage of lock_rig. A stage is skipped when it has no input or, if it is fingerprinted, when the
+        fingerprint of its inputs is the one recorded after its last run.
+        :param dry_run: only print which stages would run and how many items they would process
+        :param force: run every stage with inputs, whatever their fingerprint
+        :return:
+        """
+        metadata_key = 'lockRigFingerprints'
+        fingerprints = get_metadata(metadata_key, dict())
+
+        for name, get_inputs, func, fingerprinted in cls.get_lock_rig_stages():
+            inputs = get_inputs()
+            skip = not inputs or (fingerprinted and not force and fingerprints.get(name) == get_fingerprint(inputs))
+
+            if dry_run:
+                print('{0}: {1} ({2} item(s))'.format(name, 'skip' if skip else 'run', len(inputs)))
+                continue
+            if not inputs:
+                print('{0}: nothing to process, skipped.'.format(name))
+                continue
+            if skip:
+                print('{0}: unchanged since last lock, skipped.'.format(name))
+                continue
+
+            func()
+
+            # Record the state after the stage so an unchanged scene is skipped next time
+            if fingerprinted:
+                fingerprints[name] = get_fingerprint(get_inputs())
+                set_metadata(metadata_key, fingerprints)
 
     @classmethod
-    def lock_all_vis_attrs_on_ctrls(cls):
-        from xi.project_utils.utils import mayaUtils
+    def get_ctrls(cls):
+        ctrls = ControllerRegistry.get_all()
+
+        if not ctrls:
+            cmds.warning(NO_CONTROLLERS_WARNING)
+
+        return ctrls
+
+    @classmethod
+    def get_modeling_state(cls):
+        geo_grp = 'geometry'
+
+        if not cmds.objExists(geo_grp):
+            return dict()
+
+        # lock_modeling also clears the overrides of the descendants
+        return get_geometry_overrides(geo_grp)
+
+    @classmethod
+    def get_ng_skin_tools2_nodes(cls):
+        plugin = 'ngSkinTools2'
+
+        if not cmds.pluginInfo(plugin, q=True, loaded=True):
+            return list()
+
+        node_types = cmds.pluginInfo(plugin, q=True, dependNode=True) or list()
+        return sorted(cmds.ls(type=node_types) or list()) if node_types else list()
+
+    @classmethod
+    def get_skin_clusters_influences(cls):
+        """
+        Influences of each skinCluster, from SkinIndex without reading any weight.
+        :return: dict
+        """
+        return {skin_cluster: SkinIndex.get_influences(skin_cluster) for skin_cluster in SkinIndex.get_all()}
 
-        for ctrl in mayaUtils.Ctrl.get_all():
+    @classmethod
+    def get_all_nodes(cls):
+        return sorted(cmds.ls() or list())
+
+    @classmethod
+    def lock_all_vis_attrs_on_ctrls(cls):
+        for ctrl in cls.get_ctrls():
             cmds.setAttr('{0}.{1}'.format(ctrl, 'v'), lock=True, keyable=False)
 
     @classmethod
+    @chunk
     def optimize_skin_clusters(cls):
-        for mesh in cmds.ls(type='mesh'):
-            if 'skinCluster' in [cmds.objectType(node) for node in cmds.listHistory(mesh) or list()]:
-                print mesh
-                cmds.select(mesh)
+        for skin_clusters in Progress(SkinIndex.get_all(), status='Optimizing skin clusters', batch_size=20):
+            # Find unused influences from the weights first, then remove them without touching the selection
+            removals = list()
+            for skin_cluster in skin_clusters:
                 try:
-                    mel.eval('removeUnusedInfluences;')
-                except:
-                    pass
+                    weights = SkinWeights(skin_cluster)
+                except TypeError as e:
+                    cmds.warning('{0}: {1}'.format(skin_cluster, e))
+                    continue
+
+                unused_influences = weights.get_unused_influences()
+                if unused_influences and len(unused_influences) < len(weights.influences):
+                    removals.append((skin_cluster, unused_influences))
+
+            for skin_cluster, influences in removals:
+                cmds.skinCluster(skin_cluster, e=True, removeInfluence=influences)
+                print('{0}: {1} unused influence(s) removed.'.format(skin_cluster, len(influences)))
 
     @classmethod
     def remove_all_ng_skin_tools2(cls):
@@ -446,52 +779,73 @@ class RigUtils(object):
 
     @classmethod
     def open_ctrl_shaper(cls):
-        from ctrlShaper import ctrlShaperUi
-        ctrlShaperUi.CtrlShaperUi().show()
+        ctrlShaperUi = PluginLoader.load('ctrlShaper.ctrlShaperUi')
+
+        def create():
+            window = ctrlShaperUi.CtrlShaperUi()
+            window.show()
+            return window
+
+        WindowCache.show('ctrlShaper', create)
 
     @classmethod
     def openAnimBot(cls):
-        import animBot
-        animBot.launch()
+        # animBot toggles its own toolbar, only its import is cached
+        PluginLoader.load('animBot').launch()
 
     @classmethod
+    @chunk
     def reset_grp(cls):
-        for node in cmds.ls(sl=True) or list():
-            node_parent = cmds.listRelatives(node, parent=True)
-            rst = cmds.group(name=node + '_rst#', empty=True)
-            node_matrix = cmds.xform(node, q=True, matrix=True)
-            cmds.xform(rst, matrix=node_matrix)
-            cmds.parent(node, rst)
-            if node_parent:
-                cmds.parent(rst, node_parent[0])
+        nodes = cmds.ls(sl=True, type='transform') or list()
+        if nodes:
+            create_offset_groups(nodes, suffix='_rst')
 
 
 class MainMenu(object):
     label = 'Default'
 
+    # UI modules are only imported once the menu is displayed
+    ui_modules = ('maya.OpenMayaUI', 'PySide2.QtWidgets', 'shiboken2')
+
     def __init__(self, widget):
         self.widget = widget
 
     @classmethod
     def get_widget(cls, object_name, type_):
+        from maya import OpenMayaUI
+        from shiboken2 import wrapInstance
+
         pointer = OpenMayaUI.MQtUtil.findControl(object_name)
         return wrapInstance(long(pointer), type_)
 
-    def fill_up_menu(self):
+    def fill_up_menu(self, stopwatch):
+        from PySide2 import QtWidgets
+
         default_action = QtWidgets.QAction('default', self.widget)
         self.addAction(default_action)
 
     @classmethod
-    def display(cls):
-        if cmds.menu(cls.__name__, q=True, exists=True):
-            cls.delete()
-        cmds.menu(cls.__name__, parent='MayaWindow', label=cls.label, tearOff=True)
-        main_menu = cls(cls.get_widget(cls.__name__, QtWidgets.QMenu))
-        main_menu.fill_up_menu()
+    def display(cls, stopwatch=None):
+        stopwatch = stopwatch or Stopwatch(enabled=False)
+
+        for module in cls.ui_modules:
+            with stopwatch.measure('import {0}'.format(module)):
+                importlib.import_module(module)
+
+        from PySide2 import QtWidgets
+
+        with stopwatch.measure('create menu'):
+            if cmds.menu(cls.__name__, q=True, exists=True):
+                cls.delete()
+            cmds.menu(cls.__name__, parent='MayaWindow', label=cls.label, tearOff=True)
+            main_menu = cls(cls.get_widget(cls.__name__, QtWidgets.QMenu))
+        main_menu.fill_up_menu(stopwatch)
         return main_menu
 
     @classmethod
     def get(cls):
+        from PySide2 import QtWidgets
+
         if cmds.menu(cls.__name__, q=True, exists=True):
             return cls(cls.get_widget(cls.__name__, QtWidgets.QMenu))
         return None
@@ -509,61 +863,62 @@ class MainMenu(object):
 
 class RigMainMenu(MainMenu):
     label = 'Rig'
+    actions_path = ACTIONS_PATH
 
-    def fill_up_menu(self):
-        data = (
-            ('Locator on Gizmo', RigUtils.locator_on_gizmo, ('Ctrl+L',)),
-            ('Reset Group', RigUtils.reset_grp, ('Ctrl+Alt+G',)),
-
-            ('Skin', None, None),
-            ('Select Skinned Joints', RigUtils.select_skinned_joints, None),
-            ('Transfer Skin', RigUtils.transfer_skin, None),
-
-            ('Display', None, None),
-            ('Scale Joints Up', RigUtils.scale_joints_up, ('Ctrl++',)),
-            ('Scale Joints Down', RigUtils.scale_joints_down, ('Ctrl+-',)),
-            ('Toggle Ctrls Visibility', RigUtils.toggle_ctrls_visibility, ('7',)),
-            ('Toggle Joints Visibility', RigUtils.toggle_joints_visibility, ('9',)),
-            ('Toggle Wireframe Visibility', RigUtils.toggle_wireframe, ('8',)),
-            ('Toggle Joints Local Axis', toggleJointsLocalAxis, ('*',)),
-
-            ('Windows', None, None),
-            ('Node Editor', RigUtils.node_editor, ('Shift+N',)),
-            ('Script Editor', RigUtils.script_editor, ('Shift+S',)),
-
-            ('Misc', None, None),
-            ('Print Selection', RigUtils.print_selection, None),
-            ('Print Non-Unique Nodes', RigUtils.print_non_unique_nodes, None),
-
-            ('Plug-ins', None, None),
-            ('ngSkinTools2', RigUtils.ng_skin_tools2, ('Shift+G',)),
-            ('bsControls', RigUtils.bs_controls, ('Shift+O',)),
-            ('ctrlShaper', RigUtils.open_ctrl_shaper, None),
-            ('animBot', RigUtils.openAnimBot, None),
-
-            ('X', None, None),
-            # ('Reset Transforms', RigUtils.reset_transforms, ('Ctrl+T',)),
-            ('Reset Transforms', resetSelectedMayaCtrlsTransforms, ('Ctrl+T',)),
-            ('Select Ctrls', RigUtils.select_ctrls, ('Ctrl+Shift+C',)),
-            ('Check ControlSet', RigUtils.compare_control_set_to_all_ctrls, None),
-            ('Create Mesh Attribute', RigUtils.create_mesh_attribute, ('ctrl+M',)),
-            ('Unlock Geo', RigUtils.unlock_modeling, None),
-            ('Lock Geo', RigUtils.lock_modeling, None),
-            ('Global Local', RigUtils.create_global_local_ctrls_from_selection, ('Ctrl+Alt+C',)),
-            ('Global Local (bottom)', partial(RigUtils.create_global_local_ctrls_from_selection, bottom=True), ('Ctrl+Alt+V',)),
-            ('Lock Rig', RigUtils.lock_rig, None),
-        )
-        for label, func, shortcuts in data:
-            act = QtWidgets.QAction(label, self.widget)
-            if func:
-                act.triggered.connect(func)
-                if shortcuts:
-                    act.setShortcuts(shortcuts)
-            else:
-                act.setSeparator(True)
-
-            self.addAction(act)
-
-
-def display():
-    RigMainMenu.display()
+    def __init__(self, widget):
+        super(RigMainMenu, self).__init__(widget)
+        self.plugin_actions = dict()
+        self.plugin_modules = dict()
+
+    def check_plugins(self):
+        self.widget.aboutToShow.disconnect(self.check_plugins)
+
+        for act, module in self.plugin_actions.items():
+            if pkgutil.find_loader(module) is None:
+                act.setEnabled(False)
+                act.setToolTip('The module \'{0}\' hasnt been found.'.format(module))
+
+    def fill_up_menu(self, stopwatch):
+        from PySide2 import QtWidgets
+
+        for data in load_actions(self.actions_path):
+            label = data['label']
+            with stopwatch.measure('menu entry \'{0}\''.format(label)):
+                act = QtWidgets.QAction(label, self.widget)
+                if data.get('separator'):
+                    act.setSeparator(True)
+                else:
+                    act.triggered.connect(ActionDispatcher.get_slot(label, data['command'], data.get('kwargs')))
+                    if data.get('shortcuts'):
+                        act.setShortcuts(data['shortcuts'])
+
+                # Plug-ins availability is checked the first time the menu is shown
+                if data.get('module'):
+                    self.plugin_actions[act] = data['module']
+                    self.plugin_modules[data['module']] = data.get('preload', data['module'])
+
+                self.addAction(act)
+
+        self.widget.aboutToShow.connect(self.check_plugins)
+
+
+def display(timing=False, preload=False):
+    """
+    Display the Rig menu in Maya's main window.
+    :param timing: print how long each UI import and menu entry took
+    :param preload: import the available plug-ins of the menu when Maya is idle, instead of on their first launch
+    :return:
+    """
+    if cmds.about(batch=True):
+        cmds.warning('The Rig menu can\'t be displayed in batch mode.')
+        return
+
+    stopwatch = Stopwatch(enabled=timing)
+    main_menu = RigMainMenu.display(stopwatch=stopwatch)
+    if timing:
+        stopwatch.report('Rig menu startup')
+
+    if preload:
+        modules = main_menu.plugin_modules
+        available = [module for module in sorted(modules) if pkgutil.find_loader(module) is not None]
+        PluginLoader.preload([modules[module] for module in available])
@@ -0,0 +1,174 @@
+"""
+Run rig checks and fixes over many scene files, each file in its own mayapy process, and merge the results in one
+JSON report with per-file timings. To be run with mayapy, from the directory containing this package:
+
+    mayapy -m rigMenu.batch scenes/*.ma --checks non_unique_nodes control_sets --workers 8 --output report.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+from multiprocessing.pool import ThreadPool
+from .profiling import timer
+
+CHECKS = ('non_unique_nodes', 'control_sets', 'unused_influences')
+FIXES = ('optimize_skin_clusters', 'lock_rig')
+
+
+def get_unused_influences():
+    from .skin import SkinIndex, SkinWeights
+
+    unused_influences = dict()
+    for skin_cluster in SkinIndex.get_all():
+        influences = SkinWeights(skin_cluster).get_unused_influences()
+        if influences:
+            unused_influences[skin_cluster] = influences
+    return unused_influences
+
+
+def process_file(file_path, checks, fixes, save=False):
+    """
+    Open a scene in the current mayapy session, then run the given checks and fixes on it.
+    :param file_path: str
+    :param checks: list, names from CHECKS
+    :param fixes: list, names from FIXES
+    :param save: bool, save the scene after the fixes
+    :return: dict
+    """
+    from maya import cmds
+    from . import RigUtils
+
+    operations = {
+        'non_unique_nodes': RigUtils.get_non_unique_nodes,
+        'control_sets': RigUtils.audit_control_sets,
+        'unused_influences': get_unused_influences,
+        'optimize_skin_clusters': RigUtils.optimize_skin_clusters,
+        'lock_rig': RigUtils.lock_rig,
+    }
+
+    report = {'results': dict(), 'errors': dict(), 'timings': dict()}
+
+    start = timer()
+    cmds.file(file_path, open=True, force=True)
+    report['timings']['open'] = timer() - start
+
+    for name in list(checks) + list(fixes):
+        start = timer()
+        try:
+            report['results'][name] = operations[name]()
+        except Exception as e:
+            report['errors'][name] = str(e)
+        report['timings'][name] = timer() - start
+
+    if fixes and save:
+        cmds.file(save=True, force=True)
+
+    return report
+
+
+def run_worker(file_path, report_path, checks, fixes, save):
+    import maya.standalone
+    maya.standalone.initialize()
+
+    try:
+        report = process_file(file_path, checks, fixes, save=save)
+    finally:
+        maya.standalone.uninitialize()
+
+    with open(report_path, 'w') as f:
+        json.dump(report, f)
+
+
+def run_file(file_path, checks, fixes, save):
+    """
+    Process a file in a new mayapy process.
+    :return: dict
+    """
+    handle, report_path = tempfile.mkstemp(suffix='.json')
+    os.close(handle)
+
+    command = [sys.executable, '-m', '{0}.batch'.format(__package__), file_path, '--worker', report_path]
+    command += ['--checks'] + list(checks) + ['--fixes'] + list(fixes)
+    if save:
+        command.append('--save')
+
+    environment = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environment['PYTHONPATH'] = os.pathsep.join([root] + [path for path in [environment.get('PYTHONPATH')] if path])
+
+    start = timer()
+    process = subprocess.Popen(command, env=environment, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    output, _ = process.communicate()
+    duration = timer() - start
+
+    try:
+        with open(report_path) as f:
+            report = json.load(f)
+    except ValueError:
+        report = {'errors': {'process': output.decode('utf-8', 'replace')[-2000:]}}
+    finally:
+        os.remove(report_path)
+
+    report['time'] = duration
+    report['return_code'] = process.returncode
+    return report
+
+
+def run(file_paths, checks=CHECKS, fixes=tuple(), save=False, workers=None):
+    """
+    Process every file with a pool of mayapy processes.
+    :param file_paths: list
+    :param checks: list, names from CHECKS
+    :param fixes: list, names from FIXES
+    :param save: bool, save the scenes after the fixes
+    :param workers: int, number of processes run at once, one per core if None
+    :return: dict, the merged report
+    """
+    workers = workers or multiprocessing.cpu_count()
+
+    start = timer()
+    pool = ThreadPool(workers)
+    try:
+        reports = pool.map(lambda file_path: run_file(file_path, checks, fixes, save), file_paths)
+    finally:
+        pool.close()
+        pool.join()
+
+    return {
+        'checks': list(checks),
+        'fixes': list(fixes),
+        'workers': workers,
+        'time': timer() - start,
+        'files': dict(zip(file_paths, reports)),
+    }
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Run rig checks and fixes over many scene files.')
+    parser.add_argument('files', nargs='+', help='.ma or .mb files')
+    parser.add_argument('--checks', nargs='*', choices=CHECKS, default=list(CHECKS))
+    parser.add_argument('--fixes', nargs='*', choices=FIXES, default=list())
+    parser.add_argument('--save', action='store_true', help='save the scenes after the fixes')
+    parser.add_argument('--workers', type=int, default=None, help='one per core by default')
+    parser.add_argument('--output', help='JSON report path, printed if not given')
+    parser.add_argument('--worker', metavar='REPORT', help=argparse.SUPPRESS)
+    args = parser.parse_args(args)
+
+    if args.worker:
+        run_worker(args.files[0], args.worker, args.checks, args.fixes, args.save)
+        return
+
+    report = run(args.files, checks=args.checks, fixes=args.fixes, save=args.save, workers=args.workers)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
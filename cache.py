@@ -0,0 +1,105 @@
+from maya.api import OpenMaya
+
+
+class SceneCache(object):
+    """
+    Base class for scene data built in one pass and kept until the scene changes.
+    Subclasses implement build() and list the node types whose creation, deletion or connection changes invalidate
+    the data.
+    """
+    node_types = tuple()
+
+    _data = None
+    _callbacks = None
+
+    @classmethod
+    def build(cls):
+        raise NotImplementedError
+
+    @classmethod
+    def get(cls):
+        if cls._data is None:
+            cls._data = cls.build()
+            if cls._callbacks is None:
+                cls.add_callbacks()
+        return cls._data
+
+    @classmethod
+    def invalidate(cls, *args):
+        cls._data = None
+
+    @classmethod
+    def add_callbacks(cls):
+        callbacks = list()
+        for node_type in cls.node_types:
+            callbacks.append(OpenMaya.MDGMessage.addNodeAddedCallback(cls.invalidate, node_type))
+            callbacks.append(OpenMaya.MDGMessage.addNodeRemovedCallback(cls.invalidate, node_type))
+        callbacks.append(OpenMaya.MDGMessage.addConnectionCallback(cls.on_connection))
+        callbacks.append(OpenMaya.MNodeMessage.addNameChangedCallback(OpenMaya.MObject.kNullObj, cls.invalidate))
+        for message in (OpenMaya.MSceneMessage.kAfterNew, OpenMaya.MSceneMessage.kAfterOpen):
+            callbacks.append(OpenMaya.MSceneMessage.addCallback(message, cls.invalidate))
+        cls._callbacks = callbacks
+
+    @classmethod
+    def remove_callbacks(cls):
+        if cls._callbacks:
+            OpenMaya.MMessage.removeCallbacks(cls._callbacks)
+        cls._callbacks = None
+        cls._data = None
+
+    @classmethod
+    def on_connection(cls, source_plug, destination_plug, made, *args):
+        if cls._data is None:
+            return
+        for plug in (source_plug, destination_plug):
+            if OpenMaya.MFnDependencyNode(plug.node()).typeName in cls.node_types:
+                cls.invalidate()
+                return
+
+
+class ObjectMap(object):
+    """
+    Mapping keyed by MObject. Keys are bucketed by MObjectHandle hash code and told apart by comparing the objects,
+    as hash codes of different nodes can collide.
+    """
+
+    def __init__(self):
+        self._buckets = dict()
+
+    def _find(self, mobject, create=False):
+        hash_code = OpenMaya.MObjectHandle(mobject).hashCode()
+        bucket = self._buckets.setdefault(hash_code, list()) if create else self._buckets.get(hash_code, list())
+        for index, (handle, _) in enumerate(bucket):
+            if handle.object() == mobject:
+                return bucket, index
+        return bucket, None
+
+    def get(self, mobject, default=None):
+        bucket, index = self._find(mobject)
+        return default if index is None else bucket[index][1]
+
+    def setdefault(self, mobject, default=None):
+        bucket, index = self._find(mobject, create=True)
+        if index is None:
+            bucket.append((OpenMaya.MObjectHandle(mobject), default))
+            return default
+        return bucket[index][1]
+
+    def __setitem__(self, mobject, value):
+        bucket, index = self._find(mobject, create=True)
+        if index is None:
+            bucket.append((OpenMaya.MObjectHandle(mobject), value))
+        else:
+            bucket[index] = (bucket[index][0], value)
+
+    def __contains__(self, mobject):
+        return self._find(mobject)[1] is not None
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+    def items(self):
+        return [(handle.object(), value) for bucket in self._buckets.values() for handle, value in bucket]
+
+    def values(self):
+        return [value for bucket in self._buckets.values() for _, value in bucket]
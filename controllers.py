@@ -0,0 +1,69 @@
+from maya import cmds
+from .cache import SceneCache
+
+
+# The controllers are only the nodes tagged as such, tools relying on them warn with this when there is none
+NO_CONTROLLERS_WARNING = ('No controllers found in the scene. '
+                          'To define controllers please use Control > Tag As Controller.')
+
+
+def get_namespace(node):
+    return node.rpartition('|')[-1].rpartition(':')[0]
+
+
+class ControllerRegistry(SceneCache):
+    """
+    Controllers of the scene (nodes tagged using Control > Tag As Controller) enumerated once and indexed by name,
+    namespace and controller tag.
+    """
+    node_types = ('controller',)
+
+    @classmethod
+    def build(cls):
+        tags = cmds.ls(type='controller') or list()
+        plugs = ['{0}.controllerObject'.format(tag) for tag in tags]
+        connections = cmds.listConnections(plugs, source=True, destination=False, connections=True) or list() if plugs else list()
+
+        by_name = dict()
+        by_namespace = dict()
+        for plug, ctrl in zip(connections[::2], connections[1::2]):
+            by_name[ctrl] = plug.split('.')[0]
+            by_namespace.setdefault(get_namespace(ctrl), list()).append(ctrl)
+
+        by_tag = {tag: ctrl for ctrl, tag in by_name.items()}
+        return by_name, by_namespace, by_tag
+
+    @classmethod
+    def get_all(cls, namespace=None):
+        """
+        :param namespace: str, only the controllers of this namespace ('' for the root one), all of them if None
+        :return: list
+        """
+        by_name, by_namespace, _ = cls.get()
+        ctrls = by_name if namespace is None else by_namespace.get(namespace.strip(':'), list())
+        return sorted(ctrls)
+
+    @classmethod
+    def get_selected(cls, selection=None):
+        """
+        :param selection: list, the current selection if None
+        :return: list, the selected nodes being controllers, in selection order
+        """
+        by_name, _, _ = cls.get()
+        selection = cmds.ls(sl=True) or list() if selection is None else selection
+        return [node for node in selection if node in by_name]
+
+    @classmethod
+    def get_namespaces(cls):
+        _, by_namespace, _ = cls.get()
+        return sorted(by_namespace)
+
+    @classmethod
+    def get_tag(cls, ctrl):
+        by_name, _, _ = cls.get()
+        return by_name.get(ctrl)
+
+    @classmethod
+    def get_ctrl(cls, tag):
+        _, _, by_tag = cls.get()
+        return by_tag.get(tag)
@@ -0,0 +1,89 @@
+import importlib
+import json
+import os
+from maya import cmds
+from .profiling import Instrumentation, timer
+
+ACTIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'actions.json')
+
+
+def load_actions(file_path=ACTIONS_PATH):
+    """
+    Load menu actions, each one a dict with a label and either a separator flag or a command (dotted name resolved
+    from this package) with optional kwargs, shortcuts, the module it needs and the module to preload if not that one.
+    :param file_path: str
+    :return: list
+    """
+    with open(file_path) as f:
+        return json.load(f)
+
+
+class ActionDispatcher(object):
+    """
+    Run menu actions, resolving their command on first trigger.
+    Triggers arriving while an action runs, or queued by a held hotkey and delivered right after it, are dropped.
+    The latency of each run is added to a histogram per action.
+    """
+    debounce = 0.05
+    buckets = (0.01, 0.05, 0.1, 0.5, 1.0)
+
+    _funcs = dict()
+    _latencies = dict()
+    _last_ends = dict()
+    _running = None
+
+    @classmethod
+    def resolve(cls, command):
+        if command not in cls._funcs:
+            func = importlib.import_module(__package__)
+            for name in command.split('.'):
+                func = getattr(func, name)
+            cls._funcs[command] = func
+        return cls._funcs[command]
+
+    @classmethod
+    def get_slot(cls, label, command, kwargs=None):
+        def slot():
+            cls.dispatch(label, command, kwargs or dict())
+
+        return slot
+
+    @classmethod
+    def dispatch(cls, label, command, kwargs):
+        if cls._running is not None or timer() - cls._last_ends.get(label, 0.0) < cls.debounce:
+            return
+
+        try:
+            func = cls.resolve(command)
+        except (ImportError, AttributeError):
+            cmds.warning('Unable to find the command \'{0}\' of \'{1}\'.'.format(command, label))
+            return
+
+        cls._running = label
+        start = timer()
+        try:
+            with Instrumentation.record(label):
+                func(**kwargs)
+        finally:
+            end = timer()
+            cls._running = None
+            cls._last_ends[label] = end
+            cls.add_latency(label, end - start)
+
+    @classmethod
+    def add_latency(cls, label, duration):
+        histogram = cls._latencies.setdefault(label, [0] * (len(cls.buckets) + 1))
+        index = len([bucket for bucket in cls.buckets if duration >= bucket])
+        histogram[index] += 1
+
+    @classmethod
+    def report(cls):
+        if not cls._latencies:
+            print('# No action run yet.')
+            return
+
+        limits = ['<{0:g}ms'.format(bucket * 1000.0) for bucket in cls.buckets]
+        limits.append('>={0:g}ms'.format(cls.buckets[-1] * 1000.0))
+        print('# {0:<32}'.format('Action') + ''.join('{0:>9}'.format(limit) for limit in limits))
+        for label, histogram in sorted(cls._latencies.items()):
+            print('  {0:<32}'.format(label) + ''.join('{0:>9}'.format(count) for count in histogram))
@@ -0,0 +1,143 @@
+from maya.api import OpenMaya
+from maya import cmds
+from .cache import SceneCache
+from .controllers import get_namespace
+from .modifiers import AttributeWriter
+from .progress import Progress
+from .skin import get_mobject
+
+
+def get_display_override(node):
+    fn = OpenMaya.MFnDependencyNode(node)
+    return fn.findPlug('overrideEnabled', False).asBool(), fn.findPlug('overrideDisplayType', False).asInt()
+
+
+def get_geometry_nodes(root):
+    """
+    :param root: MObject
+    :return: list of MObject, the root followed by its descendant transforms and meshes
+    """
+    nodes = [root]
+    iterator = OpenMaya.MItDag()
+    iterator.reset(root)
+    iterator.next()
+    while not iterator.isDone():
+        node = iterator.currentItem()
+        if node.hasFn(OpenMaya.MFn.kTransform) or node.hasFn(OpenMaya.MFn.kMesh):
+            nodes.append(node)
+        iterator.next()
+    return nodes
+
+
+def get_geometry_overrides(root):
+    """
+    Get the display overrides of a geometry hierarchy, as set_geometry_lock reads them.
+    :param root: str
+    :return: dict, full path -> [enabled, display type]
+    """
+    nodes = get_geometry_nodes(get_mobject(root))
+    return {OpenMaya.MFnDagNode(node).fullPathName(): list(get_display_override(node)) for node in nodes}
+
+
+def set_geometry_lock(root, locked):
+    """
+    Lock or unlock a geometry hierarchy in one modifier per batch.
+    The root gets a reference display override (or none), its transforms and meshes have their overrides cleared so
+    they inherit it. Only the nodes whose overrides differ from that state are changed.
+    :param root: str
+    :param locked: bool
+    :return: tuple, (number of nodes changed, True if cancelled before all the changes were made)
+    """
+    nodes = get_geometry_nodes(get_mobject(root))
+    targets = [(nodes[0], (locked, 2 if locked else 0))] + [(node, (False, 0)) for node in nodes[1:]]
+
+    changes = [(node, state) for node, state in targets if get_display_override(node) != state]
+
+    count = 0
+    progress = Progress(changes, status='{0} geometry'.format('Locking' if locked else 'Unlocking'))
+    for batch in progress:
+        with AttributeWriter() as writer:
+            for node, values in batch:
+                fn = OpenMaya.MFnDependencyNode(node)
+                plugs = [fn.findPlug('overrideEnabled', False), fn.findPlug('overrideDisplayType', False)]
+
+                # Both plugs are checked first so a node is never half changed
+                if [plug for plug in plugs if plug.isFreeToChange() != OpenMaya.MPlug.kFreeToChange]:
+                    cmds.warning('Unable to set override to \'{}\'.'.format(OpenMaya.MFnDagNode(node).partialPathName()))
+                    continue
+
+                for plug, value in zip(plugs, values):
+                    writer.set(plug, value)
+                count += 1
+
+    return count, progress.cancelled
+
+
+class JointDisplay(SceneCache):
+    """
+    Joints of the scene cached per namespace, so display changes can target one character at a time and be
+    applied in bulk through a single modifier.
+    """
+    node_types = ('joint',)
+
+    @classmethod
+    def build(cls):
+        joints = dict()
+        for joint in cmds.ls(type='joint') or list():
+            joints.setdefault(get_namespace(joint), list()).append(joint)
+        return joints
+
+    @classmethod
+    def get_joints(cls, namespace=None):
+        """
+        :param namespace: str, only the joints of this namespace ('' for the root one), all of them if None
+        :return: list
+        """
+        joints = cls.get()
+        if namespace is None:
+            return [joint for namespace_joints in joints.values() for joint in namespace_joints]
+        return list(joints.get(namespace.strip(':'), list()))
+
+    @classmethod
+    def get_target_joints(cls, selection=None):
+        """
+        Get the selected joints, or the joints of the characters (namespaces) of the selection, or every joint if
+        nothing is selected.
+        :param selection: list, the current selection if None
+        :return: list
+        """
+        selection = cmds.ls(sl=True) or list() if selection is None else selection
+        if not selection:
+            return cls.get_joints()
+
+        joints = cmds.ls(selection, type='joint') or list()
+        if joints:
+            return joints
+
+        namespaces = {get_namespace(node) for node in selection}
+        return [joint for namespace in sorted(namespaces) for joint in cls.get_joints(namespace)]
+
+    @classmethod
+    def get_values(cls, joints, attr):
+        selection = OpenMaya.MSelectionList()
+        for joint in joints:
+            selection.add('{0}.{1}'.format(joint, attr))
+        return [selection.getPlug(index).asDouble() for index in range(selection.length())]
+
+    @classmethod
+    def set_values(cls, joints, attr, values):
+        with AttributeWriter() as writer:
+            for joint, value in zip(joints, values):
+                writer.set('{0}.{1}'.format(joint, attr), value)
+
+    @classmethod
+    def set_local_axis(cls, joints, state):
+        cls.set_values(joints, 'displayLocalAxis', [bool(state)] * len(joints))
+
+    @classmethod
+    def set_draw_style(cls, joints, draw_style):
+        cls.set_values(joints, 'drawStyle', [int(draw_style)] * len(joints))
+
+    @classmethod
+    def scale_radius(cls, joints, factor):
+        cls.set_values(joints, 'radius', [radius * factor for radius in cls.get_values(joints, 'radius')])
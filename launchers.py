@@ -0,0 +1,94 @@
+import importlib
+from functools import partial
+from maya import cmds
+from .profiling import Stopwatch
+
+string_types = (str, type(u''))
+
+
+class PluginLoader(object):
+    """
+    Import plug-in packages once and record how long each import took.
+    Imports can be preloaded when Maya is idle, one module per idle event so the UI stays responsive in between.
+    Imports are not run in a worker thread, plug-ins create Qt objects and call maya.cmds while being imported.
+    """
+    modules = dict()
+    stopwatch = Stopwatch()
+
+    @classmethod
+    def load(cls, name):
+        """
+        Get a module, importing it the first time.
+        :param name: str
+        :return: module
+        """
+        module = cls.modules.get(name)
+        if module is None:
+            with cls.stopwatch.measure(name):
+                module = importlib.import_module(name)
+            cls.modules[name] = module
+        return module
+
+    @classmethod
+    def preload(cls, names):
+        for name in names:
+            if name not in cls.modules:
+                cmds.evalDeferred(partial(cls.try_load, name), lowestPriority=True)
+
+    @classmethod
+    def try_load(cls, name):
+        try:
+            cls.load(name)
+        except Exception as e:
+            cmds.warning('Preloading \'{0}\' failed: {1}'.format(name, e))
+
+    @classmethod
+    def report(cls):
+        if not cls.stopwatch.records:
+            print('# No plug-in loaded yet.')
+            return
+        cls.stopwatch.report('Plug-ins load time')
+
+
+class WindowCache(object):
+    """
+    Keep the windows opened by launchers, so a second launch raises the existing window instead of rebuilding it.
+    Windows can be Qt widgets or names of Maya windows.
+    """
+    windows = dict()
+
+    @classmethod
+    def is_valid(cls, window):
+        if window is None:
+            return False
+        if isinstance(window, string_types):
+            return cmds.window(window, exists=True)
+
+        from PySide2 import QtWidgets
+        from shiboken2 import isValid
+
+        return isinstance(window, QtWidgets.QWidget) and isValid(window)
+
+    @classmethod
+    def show(cls, name, create):
+        """
+        Raise the cached window or create a new one.
+        :param name: str, key of the window in the cache
+        :param create: callable returning the window, a QWidget or the name of a Maya window
+        :return: the window
+        """
+        window = cls.windows.get(name)
+        if not cls.is_valid(window):
+            window = create()
+            cls.windows[name] = window
+            return window
+
+        if isinstance(window, string_types):
+            cmds.showWindow(window)
+        else:
+            if window.isMinimized():
+                window.showNormal()
+            window.show()
+            window.raise_()
+            window.activateWindow()
+        return window
@@ -0,0 +1,45 @@
+import hashlib
+import json
+from maya import cmds
+
+NODE = 'rigMenu_metadata'
+
+
+def get_metadata(key, default=None):
+    """
+    Read a JSON value stored on the scene metadata node.
+    :param key: str, attribute name
+    :param default: returned if the value has never been stored
+    :return:
+    """
+    plug = '{0}.{1}'.format(NODE, key)
+    if not cmds.objExists(plug):
+        return default
+
+    value = cmds.getAttr(plug)
+    return json.loads(value) if value else default
+
+
+def set_metadata(key, value):
+    """
+    Store a JSON serializable value on the scene metadata node, creating the node and attribute if needed.
+    :param key: str, attribute name
+    :param value:
+    :return:
+    """
+    if not cmds.objExists(NODE):
+        cmds.createNode('network', name=NODE, skipSelect=True)
+
+    if not cmds.attributeQuery(key, node=NODE, exists=True):
+        cmds.addAttr(NODE, longName=key, dataType='string')
+
+    cmds.setAttr('{0}.{1}'.format(NODE, key), json.dumps(value), type='string')
+
+
+def get_fingerprint(data):
+    """
+    Hash JSON serializable data.
+    :param data:
+    :return: str
+    """
+    return hashlib.md5(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
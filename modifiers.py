@@ -0,0 +1,103 @@
+import os
+from maya import cmds
+from maya.api import OpenMaya
+
+PLUGIN_NAME = 'rigMenuModifier'
+PLUGIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '{0}.py'.format(PLUGIN_NAME))
+
+_pending = list()
+
+
+def pop_pending():
+    """
+    Called by the rigMenuModifier command to take ownership of the modifier it has to execute.
+    :return: MDGModifier
+    """
+    return _pending.pop(0)
+
+
+def apply_modifier(modifier):
+    """
+    Execute the given MDGModifier (or MDagModifier) through the rigMenuModifier command so it is undoable.
+    Any object with doIt and undoIt methods can be executed the same way.
+    :param modifier: MDGModifier
+    :return:
+    """
+    if not cmds.pluginInfo(PLUGIN_NAME, q=True, loaded=True):
+        cmds.loadPlugin(PLUGIN_PATH, quiet=True)
+
+    _pending.append(modifier)
+    cmds.rigMenuModifier(__name__)
+
+
+def get_plug(plug):
+    selection = OpenMaya.MSelectionList()
+    selection.add(plug)
+    return selection.getPlug(0)
+
+
+def is_settable(plug):
+    """
+    Whether setAttr could change the plug: it isn't locked and is either unconnected or keyed by an animCurve,
+    whose value is then overridden until the next time change.
+    :param plug: MPlug
+    :return: bool
+    """
+    if plug.isFreeToChange() == OpenMaya.MPlug.kFreeToChange:
+        return True
+    if plug.isLocked or (plug.isChild and plug.parent().isLocked) or not plug.isDestination:
+        return False
+    return plug.source().node().hasFn(OpenMaya.MFn.kAnimCurve)
+
+
+class AttributeWriter(object):
+    """
+    Collect plug values and apply them at once through a single MDGModifier, undoable as one command.
+    Locked plugs and plugs driven by anything but an animCurve are skipped up front, as setAttr would refuse them.
+    Values are set in internal units (centimeters, radians).
+    """
+
+    def __init__(self):
+        self.modifier = OpenMaya.MDGModifier()
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.apply()
+
+    def set(self, plug, value):
+        """
+        Queue a value on a plug.
+        :param plug: str or MPlug
+        :param value: bool, int or float
+        :return: False if the plug doesn't exist or can't be changed
+        """
+        if not isinstance(plug, OpenMaya.MPlug):
+            try:
+                plug = get_plug(plug)
+            except RuntimeError:
+                return False
+
+        if not is_settable(plug):
+            return False
+
+        if isinstance(value, bool):
+            self.modifier.newPlugValueBool(plug, value)
+        elif isinstance(value, int):
+            self.modifier.newPlugValueInt(plug, value)
+        else:
+            self.modifier.newPlugValueDouble(plug, float(value))
+
+        self.count += 1
+        return True
+
+    def apply(self):
+        if not self.count:
+            return
+
+        apply_modifier(self.modifier)
+        self.modifier = OpenMaya.MDGModifier()
+        self.count = 0
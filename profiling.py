@@ -0,0 +1,198 @@
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+timer = getattr(time, 'perf_counter', time.time)
+
+
+class Stopwatch(object):
+    """
+    Record named durations in seconds and print them from the slowest to the fastest.
+    A disabled stopwatch measures nothing, so it can be passed around unconditionally.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.records = list()
+
+    @contextmanager
+    def measure(self, name):
+        if not self.enabled:
+            yield
+            return
+
+        start = timer()
+        try:
+            yield
+        finally:
+            self.records.append((name, timer() - start))
+
+    def report(self, title='Timings'):
+        total = sum(duration for _, duration in self.records)
+        print('# {0}: {1:.1f} ms'.format(title, total * 1000.0))
+        for name, duration in sorted(self.records, key=lambda record: record[1], reverse=True):
+            print('{0:>10.2f} ms  {1}'.format(duration * 1000.0, name))
+
+
+class Instrumentation(object):
+    """
+    Opt-in recording of the wall time of each action, with the count and total time of every maya.cmds call made
+    during the action. The last records are kept in a ring buffer.
+    While enabled, the functions of maya.cmds are wrapped, they are restored when disabled.
+    """
+    size = 100
+    records = deque(maxlen=size)
+
+    _current = None
+    _originals = dict()
+
+    @classmethod
+    def is_enabled(cls):
+        return bool(cls._originals)
+
+    @classmethod
+    def enable(cls):
+        from maya import cmds
+
+        if cls.is_enabled():
+            return
+
+        for name in dir(cmds):
+            func = getattr(cmds, name)
+            if name.startswith('_') or not callable(func):
+                continue
+            cls._originals[name] = func
+            setattr(cmds, name, cls.wrap_command(name, func))
+
+    @classmethod
+    def disable(cls):
+        from maya import cmds
+
+        for name, func in cls._originals.items():
+            setattr(cmds, name, func)
+        cls._originals.clear()
+
+    @classmethod
+    def toggle(cls):
+        if cls.is_enabled():
+            cls.disable()
+            print('# Instrumentation disabled.')
+        else:
+            cls.enable()
+            print('# Instrumentation enabled.')
+
+    @classmethod
+    def wrap_command(cls, name, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            record = cls._current
+            if record is None:
+                return func(*args, **kwargs)
+
+            start = timer()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                count, duration = record['commands'].get(name, (0, 0.0))
+                record['commands'][name] = (count + 1, duration + timer() - start)
+
+        return wrapper
+
+    @classmethod
+    @contextmanager
+    def record(cls, name):
+        """
+        Record the wrapped block as an action. Nested records are part of the outermost one.
+        :param name: str
+        :return:
+        """
+        if not cls.is_enabled() or cls._current is not None:
+            yield
+            return
+
+        cls._current = {'name': name, 'time': 0.0, 'commands': dict()}
+        start = timer()
+        try:
+            yield
+        finally:
+            cls._current['time'] = timer() - start
+            cls.records.append(cls._current)
+            cls._current = None
+
+    @classmethod
+    def dump(cls, file_path):
+        with open(file_path, 'w') as f:
+            json.dump(list(cls.records), f, indent=2)
+
+    @classmethod
+    def report(cls, top=10):
+        if not cls.records:
+            print('# No action recorded, enable the instrumentation and run some actions.')
+            return
+
+        for record in cls.records:
+            print('# {0}: {1:.1f} ms'.format(record['name'], record['time'] * 1000.0))
+            commands = sorted(record['commands'].items(), key=lambda item: item[1][1], reverse=True)
+            for name, (count, duration) in commands[:top]:
+                share = duration / record['time'] * 100.0 if record['time'] else 0.0
+                print('{0:>10.2f} ms {1:>5.1f}% {2:>7} x  {3}'.format(duration * 1000.0, share, count, name))
+
+
+def get_profiler_costs(nodes):
+    """
+    Sum the duration of the profiler events of the given nodes.
+    :param nodes: set of node names
+    :return: dict, node -> duration in milliseconds
+    """
+    from maya import cmds
+
+    # Events are filtered on their name alone, the duration is only queried for the ones of the given nodes
+    costs = dict()
+    for index in range(cmds.profiler(q=True, eventCount=True) or 0):
+        name = cmds.profiler(q=True, eventIndex=index, eventName=True)
+        if name not in nodes:
+            continue
+        duration = cmds.profiler(q=True, eventIndex=index, eventDuration=True) / 1000.0
+        costs[name] = costs.get(name, 0.0) + duration
+    return costs
+
+
+def profile_playback(start, end, nodes=None, draw=False):
+    """
+    Scrub a frame range in parallel evaluation and measure the frame rate, recording the evaluation cost of the
+    given nodes with the profiler. The evaluation mode and current time are restored afterwards.
+    :param start: int
+    :param end: int
+    :param nodes: list of node names to report the evaluation cost of
+    :param draw: bool, refresh the viewport on each frame, measuring the drawing too
+    :return: dict
+    """
+    from maya import cmds
+
+    mode, = cmds.evaluationManager(q=True, mode=True)
+    current_time = cmds.currentTime(q=True)
+    frames = range(int(start), int(end) + 1)
+
+    cmds.evaluationManager(mode='parallel')
+    cmds.profiler(reset=True)
+    cmds.profiler(sampling=True)
+    try:
+        begin = timer()
+        for frame in frames:
+            cmds.currentTime(frame, update=True)
+            if draw:
+                cmds.refresh(force=True)
+        elapsed = timer() - begin
+    finally:
+        cmds.profiler(sampling=False)
+        cmds.evaluationManager(mode=mode)
+        cmds.currentTime(current_time)
+
+    return {
+        'frames': [frames[0], frames[-1]] if frames else list(),
+        'fps': len(frames) / elapsed if elapsed else 0.0,
+        'draw': draw,
+        'nodes': get_profiler_costs(set(nodes or list())),
+    }
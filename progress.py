@@ -0,0 +1,37 @@
+from maya import cmds, mel
+
+
+class Progress(object):
+    """
+    Iterate over items in batches while showing Maya's main progress bar. Pressing Escape cancels between two
+    batches, what has been processed is kept.
+    """
+
+    def __init__(self, items, status='', batch_size=500):
+        self.items = list(items)
+        self.status = status
+        self.batch_size = batch_size
+        self.cancelled = False
+
+    def __iter__(self):
+        if cmds.about(batch=True):
+            for start in range(0, len(self.items), self.batch_size):
+                yield self.items[start:start + self.batch_size]
+            return
+
+        bar = mel.eval('$tmp = $gMainProgressBar')
+        cmds.progressBar(
+            bar, e=True, beginProgress=True, isInterruptable=True, status=self.status, maxValue=max(len(self.items), 1)
+        )
+        try:
+            for start in range(0, len(self.items), self.batch_size):
+                if cmds.progressBar(bar, q=True, isCancelled=True):
+                    self.cancelled = True
+                    cmds.warning('{0} cancelled.'.format(self.status or 'Operation'))
+                    break
+
+                batch = self.items[start:start + self.batch_size]
+                yield batch
+                cmds.progressBar(bar, e=True, step=len(batch))
+        finally:
+            cmds.progressBar(bar, e=True, endProgress=True)
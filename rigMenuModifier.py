@@ -0,0 +1,43 @@
+"""
+Maya plug-in registering the rigMenuModifier command.
+The command takes the name of the python module holding a pending modifier, executes it and keeps it so Maya can
+undo and redo it like any other command.
+"""
+import sys
+from maya.api import OpenMaya
+
+maya_useNewAPI = True
+
+
+class RigMenuModifierCommand(OpenMaya.MPxCommand):
+    name = 'rigMenuModifier'
+
+    def __init__(self):
+        OpenMaya.MPxCommand.__init__(self)
+        self.modifier = None
+
+    @classmethod
+    def creator(cls):
+        return cls()
+
+    def doIt(self, args):
+        module = sys.modules[args.asString(0)]
+        self.modifier = module.pop_pending()
+        self.modifier.doIt()
+
+    def redoIt(self):
+        self.modifier.doIt()
+
+    def undoIt(self):
+        self.modifier.undoIt()
+
+    def isUndoable(self):
+        return True
+
+
+def initializePlugin(plugin):
+    OpenMaya.MFnPlugin(plugin).registerCommand(RigMenuModifierCommand.name, RigMenuModifierCommand.creator)
+
+
+def uninitializePlugin(plugin):
+    OpenMaya.MFnPlugin(plugin).deregisterCommand(RigMenuModifierCommand.name)
@@ -0,0 +1,544 @@
+import json
+import mmap
+import struct
+import sys
+from array import array
+from maya import cmds
+from maya.api import OpenMaya, OpenMayaAnim
+from .cache import SceneCache, ObjectMap
+from .modifiers import AttributeWriter, apply_modifier
+
+SKIN_CLUSTER_ATTRIBUTES = (
+    'skinningMethod', 'useComponents', 'deformUserNormals', 'dqsSupportNonRigid',
+    'dqsScaleX', 'dqsScaleY', 'dqsScaleZ', 'normalizeWeights', 'weightDistribution',
+    'maintainMaxInfluences', 'maxInfluences', 'envelope'
+)
+
+# Snapshot layout: header, JSON metadata (influences and attributes), then CSR arrays of vertex offsets, influence
+# indices and weights, all little-endian
+SNAPSHOT_MAGIC = b'RMSW'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = '<4sHIII'
+
+
+def get_mobject(node):
+    selection = OpenMaya.MSelectionList()
+    selection.add(node)
+    return selection.getDependNode(0)
+
+
+def get_output_shape(fn):
+    """
+    Get the shape deformed through the first output connection of a skinCluster.
+    :param fn: MFnSkinCluster
+    :return: MDagPath
+    """
+    return fn.getPathAtIndex(fn.indexForOutputConnection(0))
+
+
+def get_points_component(shape):
+    """
+    Build a component holding every point of the given shape: the vertices of a mesh, the CVs of a NURBS curve or
+    surface (without the ones overlapping on periodic forms), or the points of a lattice.
+    :param shape: MDagPath
+    :return: MObject
+    """
+    if shape.hasFn(OpenMaya.MFn.kMesh):
+        fn = OpenMaya.MFnSingleIndexedComponent()
+        component = fn.create(OpenMaya.MFn.kMeshVertComponent)
+        fn.setCompleteData(OpenMaya.MFnMesh(shape).numVertices)
+    elif shape.hasFn(OpenMaya.MFn.kNurbsCurve):
+        curve_fn = OpenMaya.MFnNurbsCurve(shape)
+        periodic = curve_fn.form == OpenMaya.MFnNurbsCurve.kPeriodic
+        fn = OpenMaya.MFnSingleIndexedComponent()
+        component = fn.create(OpenMaya.MFn.kCurveCVComponent)
+        fn.setCompleteData(curve_fn.numCVs - (curve_fn.degree if periodic else 0))
+    elif shape.hasFn(OpenMaya.MFn.kNurbsSurface):
+        surface_fn = OpenMaya.MFnNurbsSurface(shape)
+        periodic_u = surface_fn.formInU == OpenMaya.MFnNurbsSurface.kPeriodic
+        periodic_v = surface_fn.formInV == OpenMaya.MFnNurbsSurface.kPeriodic
+        fn = OpenMaya.MFnDoubleIndexedComponent()
+        component = fn.create(OpenMaya.MFn.kSurfaceCVComponent)
+        fn.setCompleteData(
+            surface_fn.numCVsInU - (surface_fn.degreeInU if periodic_u else 0),
+            surface_fn.numCVsInV - (surface_fn.degreeInV if periodic_v else 0),
+        )
+    elif shape.hasFn(OpenMaya.MFn.kLattice):
+        lattice_fn = OpenMaya.MFnDependencyNode(shape.node())
+        fn = OpenMaya.MFnTripleIndexedComponent()
+        component = fn.create(OpenMaya.MFn.kLatticeComponent)
+        fn.setCompleteData(*[lattice_fn.findPlug(attr, False).asInt() for attr in ('sd', 'td', 'ud')])
+    else:
+        raise TypeError('The geometry of \'{0}\' is not supported.'.format(shape.partialPathName()))
+    return component
+
+
+def get_influence_names(fn):
+    return [path.partialPathName() for path in fn.influenceObjects()]
+
+
+def to_bytes(data):
+    if sys.byteorder == 'big':
+        data = array(data.typecode, data)
+        data.byteswap()
+    return data.tobytes() if hasattr(data, 'tobytes') else data.tostring()
+
+
+def from_bytes(typecode, buffer_):
+    data = array(typecode)
+    if hasattr(data, 'frombytes'):
+        data.frombytes(buffer_)
+    else:
+        data.fromstring(buffer_)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data
+
+
+def get_sparse_weights(weights, count):
+    """
+    Split flat weights into the (influence index, weight) pairs of each point, keeping the non-zero weights only.
+    :param weights: MDoubleArray, count values per point
+    :param count: int
+    :return: list of lists of tuples
+    """
+    # One conversion of the whole array is much faster than reading its items one by one
+    weights = list(weights)
+    indices = range(count)
+    return [
+        [(index, weight) for index, weight in zip(indices, weights[start:start + count]) if weight]
+        for start in range(0, len(weights), count)
+    ]
+
+
+def get_columns(influences, skin_cluster_influences):
+    """
+    Map each influence to its index among the influences of a skinCluster.
+    :param influences: list
+    :param skin_cluster_influences: list
+    :return: list, the index of each influence or None if the skinCluster isn't bound to it
+    """
+    indices = {name: index for index, name in enumerate(skin_cluster_influences)}
+    return [indices.get(name) for name in influences]
+
+
+def expand_weights(offsets, indices, values, columns, count):
+    """
+    Build the weights of every point from the CSR arrays of a snapshot, in the order of the influences of a
+    skinCluster. The weights missing from the arrays are zero.
+    :param offsets: array, start of the weights of each point in indices and values, plus their end
+    :param indices: array, snapshot influence index of each weight
+    :param values: array
+    :param columns: list, the skinCluster influence index of each snapshot influence
+    :param count: int, number of skinCluster influences
+    :return: MDoubleArray, count values per point
+    """
+    weights = OpenMaya.MDoubleArray((len(offsets) - 1) * count, 0.0)
+    for vertex in range(len(offsets) - 1):
+        start = vertex * count
+        for position in range(offsets[vertex], offsets[vertex + 1]):
+            weights[start + columns[indices[position]]] = values[position]
+    return weights
+
+
+class WeightsModifier(object):
+    """
+    Write of skinCluster weights run through apply_modifier, so it can be undone like an MDGModifier. The weights
+    replaced by doIt are written back by undoIt.
+    """
+
+    def __init__(self, skin_cluster, shape, component, indices, values):
+        self.skin_cluster = skin_cluster
+        self.shape = shape
+        self.component = component
+        self.indices = indices
+        self.values = values
+        self.old_values = None
+
+    def doIt(self):
+        fn = OpenMayaAnim.MFnSkinCluster(self.skin_cluster)
+        self.old_values = fn.setWeights(
+            self.shape, self.component, self.indices, self.values, normalize=False, returnOldWeights=True
+        )
+
+    def undoIt(self):
+        fn = OpenMayaAnim.MFnSkinCluster(self.skin_cluster)
+        fn.setWeights(self.shape, self.component, self.indices, self.old_values, normalize=False)
+
+
+def set_weights(skin_cluster, influences, values):
+    """
+    Write the weights of every influence on every point of the shape deformed by the given skinCluster in one
+    undoable call. The influences of the skinCluster missing from the given ones are set to zero.
+    :param skin_cluster: str
+    :param influences: list, names of the influences the values are given for
+    :param values: MDoubleArray or flat list of weights, len(influences) values per point
+    :return:
+    """
+    mobject = get_mobject(skin_cluster)
+    fn = OpenMayaAnim.MFnSkinCluster(mobject)
+    shape = get_output_shape(fn)
+
+    skin_cluster_influences = get_influence_names(fn)
+    if influences != skin_cluster_influences:
+        count = len(influences)
+        skin_cluster_count = len(skin_cluster_influences)
+        columns = {name: index for index, name in enumerate(influences)}
+
+        # Move each given column to the one of its influence, the others stay at zero
+        all_values = [0.0] * (len(values) // count * skin_cluster_count) if count else list()
+        for index, name in enumerate(skin_cluster_influences):
+            if name in columns:
+                all_values[index::skin_cluster_count] = values[columns[name]::count]
+        values = all_values
+
+    if not isinstance(values, OpenMaya.MDoubleArray):
+        values = OpenMaya.MDoubleArray(values)
+
+    indices = OpenMaya.MIntArray(range(len(skin_cluster_influences)))
+    apply_modifier(WeightsModifier(mobject, shape, get_points_component(shape), indices, values))
+
+
+class SkinWeights(object):
+    """
+    Weights of a skinCluster read once through the API, whatever its geometry, and kept as the non-zero weights of
+    each point. The weights of a mesh can be sampled by closest point on any number of destination shapes without
+    querying the source again.
+    """
+
+    def __init__(self, skin_cluster):
+        self.skin_cluster = skin_cluster
+        self.fn = OpenMayaAnim.MFnSkinCluster(get_mobject(skin_cluster))
+        self.shape = get_output_shape(self.fn)
+        self.is_mesh = self.shape.hasFn(OpenMaya.MFn.kMesh)
+        self.influences = get_influence_names(self.fn)
+
+        weights, self.influence_count = self.fn.getWeights(self.shape, get_points_component(self.shape))
+        self.vertex_weights = get_sparse_weights(weights, self.influence_count)
+
+        self._mesh = None
+        self._intersector = None
+
+    @property
+    def mesh(self):
+        # Only needed to sample the weights of a mesh
+        if self._mesh is None:
+            self._mesh = OpenMaya.MFnMesh(self.shape)
+        return self._mesh
+
+    @property
+    def intersector(self):
+        # One spatial index over the source mesh, built on first sampling and shared by every destination
+        if self._intersector is None:
+            self._intersector = OpenMaya.MMeshIntersector()
+            self._intersector.create(self.shape.node(), self.shape.inclusiveMatrix())
+        return self._intersector
+
+    def get_unused_influences(self):
+        """
+        Get the influences without any weight.
+        :return: list
+        """
+        used = {index for weights in self.vertex_weights for index, _ in weights}
+        return [name for index, name in enumerate(self.influences) if index not in used]
+
+    def get_closest_triangles(self, points):
+        """
+        Find the closest triangle of the source mesh to each given world space point.
+        :param points: MPointArray
+        :return: list of ((a, b, c) vertices, (u, v, w) barycentric coordinates) tuples
+        """
+        triangles = list()
+        for point in points:
+            point_on_mesh = self.intersector.getClosestPoint(point)
+            vertices = self.mesh.getPolygonTriangleVertices(point_on_mesh.face, point_on_mesh.triangle)
+            u, v = point_on_mesh.barycentricCoords
+            triangles.append((tuple(vertices), (u, v, 1.0 - u - v)))
+        return triangles
+
+    def interpolate(self, triangles, columns=None, count=None):
+        """
+        Interpolate the source weights on triangles. Only the non-zero weights of their vertices are read.
+        :param triangles: list, as returned by get_closest_triangles
+        :param columns: list, the destination column of each source influence or None to drop it, the source order
+        if None
+        :param count: int, number of destination columns
+        :return: MDoubleArray, count values per triangle
+        """
+        if columns is None:
+            columns, count = range(self.influence_count), self.influence_count
+        vertex_weights = self.vertex_weights
+
+        values = OpenMaya.MDoubleArray(len(triangles) * count, 0.0)
+        for position, (vertices, coordinates) in enumerate(triangles):
+            start = position * count
+            for vertex, coordinate in zip(vertices, coordinates):
+                for index, weight in vertex_weights[vertex]:
+                    column = columns[index]
+                    if column is not None:
+                        values[start + column] += weight * coordinate
+
+        return values
+
+    def sample(self, points, columns=None, count=None):
+        """
+        Interpolate the source weights at the closest point of each given world space point.
+        :param points: MPointArray
+        :param columns: list, see interpolate
+        :param count: int, see interpolate
+        :return: MDoubleArray, count values per point
+        """
+        return self.interpolate(self.get_closest_triangles(points), columns, count)
+
+    def transfer(self, skin_cluster):
+        """
+        Write the sampled weights on every point of the shape deformed by the given skinCluster in one call.
+        The weights are sampled straight in the order of the destination influences, the source influences the
+        destination isn't bound to are dropped.
+        :param skin_cluster: str
+        :return:
+        """
+        fn = OpenMayaAnim.MFnSkinCluster(get_mobject(skin_cluster))
+        shape = get_output_shape(fn)
+        influences = get_influence_names(fn)
+
+        points = OpenMaya.MItGeometry(shape).allPositions(OpenMaya.MSpace.kWorld)
+        values = self.sample(points, get_columns(self.influences, influences), len(influences))
+        set_weights(skin_cluster, influences, values)
+
+
+def export_weights(skin_cluster, file_path):
+    """
+    Write a snapshot of the skinCluster weights, influences and attributes. Only non-zero weights are stored.
+    :param skin_cluster: str
+    :param file_path: str
+    :return: int, number of vertices written
+    """
+    weights = SkinWeights(skin_cluster)
+
+    offsets = array('I', [0])
+    indices = array('H')
+    values = array('f')
+    for vertex_weights in weights.vertex_weights:
+        for index, value in vertex_weights:
+            indices.append(index)
+            values.append(value)
+        offsets.append(len(indices))
+
+    metadata = json.dumps({
+        'influences': weights.influences,
+        'attributes': {attr: cmds.getAttr('{0}.{1}'.format(skin_cluster, attr)) for attr in SKIN_CLUSTER_ATTRIBUTES},
+    }).encode('utf-8')
+
+    vertex_count = len(offsets) - 1
+    with open(file_path, 'wb') as f:
+        f.write(struct.pack(SNAPSHOT_HEADER, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, vertex_count, len(values), len(metadata)))
+        f.write(metadata)
+        for data in (offsets, indices, values):
+            f.write(to_bytes(data))
+
+    return vertex_count
+
+
+def read_weights(file_path):
+    """
+    Read a snapshot written by export_weights through a memory map.
+    :param file_path: str
+    :return: tuple, (metadata dict, vertex count, (offsets, indices, values) arrays), metadata and arrays are None
+    if the file is not a complete snapshot
+    """
+    with open(file_path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            return None, 0, None
+
+    try:
+        offset = struct.calcsize(SNAPSHOT_HEADER)
+        if len(mapped) < offset:
+            return None, 0, None
+
+        magic, version, vertex_count, value_count, metadata_size = struct.unpack_from(SNAPSHOT_HEADER, mapped, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            return None, 0, None
+
+        sizes = (('I', vertex_count + 1), ('H', value_count), ('f', value_count))
+        if len(mapped) < offset + metadata_size + sum(size * array(typecode).itemsize for typecode, size in sizes):
+            return None, 0, None
+
+        try:
+            metadata = json.loads(mapped[offset:offset + metadata_size].decode('utf-8'))
+        except ValueError:
+            return None, 0, None
+        offset += metadata_size
+
+        arrays = list()
+        for typecode, size in sizes:
+            length = size * array(typecode).itemsize
+            arrays.append(from_bytes(typecode, mapped[offset:offset + length]))
+            offset += length
+    finally:
+        mapped.close()
+
+    return metadata, vertex_count, tuple(arrays)
+
+
+def import_weights(mesh, file_path):
+    """
+    Apply a snapshot on a mesh, skinning it or adding the missing influences to its skinCluster first.
+    :param mesh: str
+    :param file_path: str
+    :return: str, the skinCluster or None if the snapshot doesn't match the mesh
+    """
+    metadata, vertex_count, arrays = read_weights(file_path)
+    if metadata is None:
+        cmds.warning('\'{0}\' is not a skin weights snapshot.'.format(file_path))
+        return None
+
+    mesh_vertex_count = cmds.polyEvaluate(mesh, vertex=True)
+    if mesh_vertex_count != vertex_count:
+        cmds.warning('\'{0}\' has {1} vertices, the snapshot has {2}.'.format(mesh, mesh_vertex_count, vertex_count))
+        return None
+
+    influences = metadata['influences']
+    skin_clusters = SkinIndex.get_skin_clusters(mesh)
+    if skin_clusters:
+        skin_cluster = skin_clusters[0]
+        missing_influences = [name for name in influences if name not in SkinIndex.get_influences(skin_cluster)]
+        if missing_influences:
+            cmds.skinCluster(skin_cluster, e=True, addInfluence=missing_influences, weight=0.0)
+    else:
+        skin_cluster, = cmds.skinCluster(mesh, influences, toSelectedBones=True)
+
+    with AttributeWriter() as writer:
+        for attr, value in metadata['attributes'].items():
+            writer.set('{0}.{1}'.format(skin_cluster, attr), value)
+
+    # Expanded straight in the skinCluster influence order, the influences missing from the snapshot stay at zero
+    skin_cluster_influences = get_influence_names(OpenMayaAnim.MFnSkinCluster(get_mobject(skin_cluster)))
+    columns = get_columns(influences, skin_cluster_influences)
+    weights = expand_weights(arrays[0], arrays[1], arrays[2], columns, len(skin_cluster_influences))
+    set_weights(skin_cluster, skin_cluster_influences, weights)
+    return skin_cluster
+
+
+class SkinIndex(SceneCache):
+    """
+    Scene-wide maps of deformed geometry to skinClusters and of skinClusters to influences, built in one pass over
+    the scene skinClusters.
+    Geometry is indexed by shape and by parent transform so both can be looked up.
+    """
+    node_types = ('skinCluster',)
+
+    @classmethod
+    def build(cls):
+        skin_clusters = ObjectMap()
+        influences = dict()
+        geometries = dict()
+        for skin_cluster in cmds.ls(type='skinCluster') or list():
+            fn = OpenMayaAnim.MFnSkinCluster(get_mobject(skin_cluster))
+            influences[skin_cluster] = get_influence_names(fn)
+            geometries[skin_cluster] = list()
+
+            for shape in fn.getOutputGeometry():
+                shape_fn = OpenMaya.MFnDagNode(shape)
+                geometries[skin_cluster].append(shape_fn.partialPathName())
+                nodes = [shape] + [shape_fn.parent(index) for index in range(shape_fn.parentCount())]
+                for node in nodes:
+                    skin_clusters.setdefault(node, list()).append(skin_cluster)
+
+        return skin_clusters, influences, geometries
+
+    @classmethod
+    def get_skin_clusters(cls, node):
+        """
+        Get the skinClusters deforming the given node. Components and transforms resolve to their shape.
+        :param node: str or MObject
+        :return: list
+        """
+        if isinstance(node, OpenMaya.MObject):
+            mobject = node
+        else:
+            try:
+                mobject = get_mobject(node)
+            except RuntimeError:
+                return list()
+        skin_clusters, _, _ = cls.get()
+        return list(skin_clusters.get(mobject, list()))
+
+    @classmethod
+    def get_influences(cls, skin_cluster):
+        _, influences, _ = cls.get()
+        return list(influences.get(skin_cluster, list()))
+
+    @classmethod
+    def get_all(cls):
+        _, influences, _ = cls.get()
+        return sorted(influences)
+
+    @classmethod
+    def get_geometries(cls):
+        """
+        Get every skinned shape of the scene.
+        :return: list
+        """
+        _, _, geometries = cls.get()
+        return sorted({shape for shapes in geometries.values() for shape in shapes})
+
+
+def get_components_influences(skin_cluster, dag_path, component):
+    """
+    Get the influences of a skinCluster with a non-zero weight on the given components.
+    :param skin_cluster: str
+    :param dag_path: MDagPath of the components mesh, shape or transform
+    :param component: MObject
+    :return: list
+    """
+    fn = OpenMayaAnim.MFnSkinCluster(get_mobject(skin_cluster))
+    path_name = dag_path.fullPathName()
+
+    for connection in range(fn.numOutputConnections()):
+        shape = fn.getPathAtIndex(fn.indexForOutputConnection(connection))
+        shape_name = shape.fullPathName()
+        if shape_name == path_name or shape_name.startswith(path_name + '|'):
+            break
+    else:
+        return list()
+
+    weights, count = fn.getWeights(shape, component)
+    weights = list(weights)
+    return [name for index, name in enumerate(get_influence_names(fn)) if any(weights[index::count])]
+
+
+def get_selection_influences():
+    """
+    Resolve the influences of the selected skinned nodes, querying each skinCluster once.
+    Selected components only resolve to the influences with a non-zero weight on them.
+    :return: sorted list
+    """
+    selection = OpenMaya.MGlobal.getActiveSelectionList()
+
+    skin_clusters = set()
+    influences = set()
+    for index in range(selection.length()):
+        node = selection.getDependNode(index)
+        node_skin_clusters = SkinIndex.get_skin_clusters(node)
+        if not node_skin_clusters:
+            continue
+
+        try:
+            dag_path, component = selection.getComponent(index)
+        except (RuntimeError, TypeError):
+            component = OpenMaya.MObject.kNullObj
+
+        if component.isNull():
+            skin_clusters.update(node_skin_clusters)
+        else:
+            for skin_cluster in node_skin_clusters:
+                influences.update(get_components_influences(skin_cluster, dag_path, component))
+
+    for skin_cluster in skin_clusters:
+        influences.update(SkinIndex.get_influences(skin_cluster))
+
+    return sorted(influences)
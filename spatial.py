@@ -0,0 +1,183 @@
+import math
+from maya import cmds
+from maya.api import OpenMaya
+from .modifiers import apply_modifier
+
+
+def get_selection_points(selection=None):
+    """
+    Fetch the world space points of each selected object, or of its selected components, through the API.
+    Transforms gather the points of every shape below them.
+    :param selection: list, the current selection if None
+    :return: list of (name, MPointArray)
+    """
+    selection = cmds.ls(sl=True) or list() if selection is None else selection
+
+    # Components are converted to vertices and grouped per object
+    groups = dict()
+    order = list()
+    for item in selection:
+        name = item.split('.')[0]
+        if name not in groups:
+            groups[name] = list()
+            order.append(name)
+        if '.' in item:
+            groups[name] += cmds.polyListComponentConversion(item, toVertex=True) or [item]
+
+    result = list()
+    for name in order:
+        items = groups[name]
+        if not items:
+            items = cmds.listRelatives(name, allDescendents=True, type='controlPoint', fullPath=True) or list()
+            items = cmds.ls(items + [name], type='controlPoint', noIntermediate=True, long=True) or list()
+
+        selection_list = OpenMaya.MSelectionList()
+        for item in items:
+            selection_list.add(item)
+
+        points = OpenMaya.MPointArray()
+        for index in range(selection_list.length()):
+            dag_path, component = selection_list.getComponent(index)
+            iterator = OpenMaya.MItGeometry(dag_path, component) if not component.isNull() else OpenMaya.MItGeometry(dag_path)
+            for point in iterator.allPositions(OpenMaya.MSpace.kWorld):
+                points.append(point)
+
+        if len(points):
+            result.append((name, points))
+
+    return result
+
+
+def get_bounding_box(points):
+    """
+    :param points: MPointArray
+    :return: tuple, (min, max) as (x, y, z) tuples
+    """
+    xs, ys, zs = [p.x for p in points], [p.y for p in points], [p.z for p in points]
+    return (min(xs), min(ys), min(zs)), (max(xs), max(ys), max(zs))
+
+
+def get_centroid(points):
+    count = float(len(points))
+    return sum(p.x for p in points) / count, sum(p.y for p in points) / count, sum(p.z for p in points) / count
+
+
+def get_eigen_vectors(matrix, iterations=50):
+    """
+    Diagonalize a symmetric 3x3 matrix with the Jacobi eigenvalue algorithm.
+    :param matrix: 3x3 nested lists
+    :param iterations: int
+    :return: list of (eigenvalue, eigenvector) sorted by decreasing eigenvalue
+    """
+    a = [list(row) for row in matrix]
+    v = [[1.0 if row == column else 0.0 for column in range(3)] for row in range(3)]
+
+    for _ in range(iterations):
+        p, q = max(((0, 1), (0, 2), (1, 2)), key=lambda pq: abs(a[pq[0]][pq[1]]))
+        if abs(a[p][q]) < 1e-12:
+            break
+
+        theta = (a[q][q] - a[p][p]) / (2.0 * a[p][q])
+        t = (1.0 if theta >= 0.0 else -1.0) / (abs(theta) + math.sqrt(theta * theta + 1.0))
+        c = 1.0 / math.sqrt(t * t + 1.0)
+        s = t * c
+
+        for k in range(3):
+            a[k][p], a[k][q] = c * a[k][p] - s * a[k][q], s * a[k][p] + c * a[k][q]
+        for k in range(3):
+            a[p][k], a[q][k] = c * a[p][k] - s * a[q][k], s * a[p][k] + c * a[q][k]
+        for k in range(3):
+            v[k][p], v[k][q] = c * v[k][p] - s * v[k][q], s * v[k][p] + c * v[k][q]
+
+    pairs = [(a[index][index], [v[0][index], v[1][index], v[2][index]]) for index in range(3)]
+    return sorted(pairs, key=lambda pair: pair[0], reverse=True)
+
+
+def get_pca_frame(points):
+    """
+    Compute a frame at the centroid of the points, its axes following their principal directions (x the longest).
+    :param points: MPointArray
+    :return: MMatrix
+    """
+    cx, cy, cz = get_centroid(points)
+    covariance = [[0.0] * 3 for _ in range(3)]
+    for point in points:
+        d = (point.x - cx, point.y - cy, point.z - cz)
+        for row in range(3):
+            for column in range(row, 3):
+                covariance[row][column] += d[row] * d[column]
+    for row in range(3):
+        for column in range(row):
+            covariance[row][column] = covariance[column][row]
+
+    (_, x_axis), (_, y_axis), _ = get_eigen_vectors(covariance)
+    x_axis = OpenMaya.MVector(x_axis).normal()
+    y_axis = OpenMaya.MVector(y_axis).normal()
+    z_axis = (x_axis ^ y_axis).normal()
+
+    return OpenMaya.MMatrix((
+        x_axis.x, x_axis.y, x_axis.z, 0.0,
+        y_axis.x, y_axis.y, y_axis.z, 0.0,
+        z_axis.x, z_axis.y, z_axis.z, 0.0,
+        cx, cy, cz, 1.0,
+    ))
+
+
+def get_frame(points, mode='center'):
+    """
+    :param points: MPointArray
+    :param mode: str, 'center' of the bounding box, 'bottom' center of the bounding box, 'centroid' or 'pca'
+    :return: MMatrix
+    """
+    if mode == 'pca':
+        return get_pca_frame(points)
+
+    if mode == 'centroid':
+        position = get_centroid(points)
+    else:
+        pa, pb = get_bounding_box(points)
+        position = [(a + b) / 2.0 for a, b in zip(pa, pb)]
+        if mode == 'bottom':
+            position[1] = pa[1]
+
+    matrix = OpenMaya.MMatrix()
+    for column, value in enumerate(position):
+        matrix.setElement(3, column, value)
+    return matrix
+
+
+def create_locators(matrices, name='guide_loc'):
+    """
+    Create a locator per world matrix in one undoable MDagModifier.
+    :param matrices: list of MMatrix
+    :param name: str, locators are named <name><number>
+    :return: list, the locators
+    """
+    used_names = set(cmds.ls('{0}*'.format(name)) or list())
+
+    modifier = OpenMaya.MDagModifier()
+    locators = list()
+    number = 1
+    for matrix in matrices:
+        while '{0}{1}'.format(name, number) in used_names:
+            number += 1
+        used_names.add('{0}{1}'.format(name, number))
+
+        transform = modifier.createNode('transform')
+        modifier.renameNode(transform, '{0}{1}'.format(name, number))
+        modifier.createNode('locator', transform)
+
+        transformation = OpenMaya.MTransformationMatrix(matrix)
+        translation = transformation.translation(OpenMaya.MSpace.kTransform)
+        rotation = transformation.rotation()
+        fn = OpenMaya.MFnDependencyNode(transform)
+        values = zip(('tx', 'ty', 'tz', 'rx', 'ry', 'rz'), (translation.x, translation.y, translation.z, rotation.x, rotation.y, rotation.z))
+        for attr, value in values:
+            modifier.newPlugValueDouble(fn.findPlug(attr, False), value)
+
+        locators.append(transform)
+
+    if locators:
+        apply_modifier(modifier)
+
+    return [OpenMaya.MFnDagNode(locator).fullPathName() for locator in locators]
@@ -0,0 +1,32 @@
+import importlib
+import os
+import sys
+import pytest
+
+TESTS = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(TESTS)
+
+# The fake maya package has to come first, the package itself is imported by its directory name
+sys.path.insert(0, os.path.join(TESTS, 'fake'))
+sys.path.insert(1, os.path.dirname(ROOT))
+
+from maya import cmds
+from maya._scene import scene as maya_scene
+
+
+@pytest.fixture(scope='session')
+def rig():
+    return importlib.import_module(os.path.basename(ROOT))
+
+
+@pytest.fixture
+def scene():
+    cmds.file(new=True, force=True)
+    cmds.calls.clear()
+    return maya_scene
+
+
+@pytest.fixture
+def calls():
+    return cmds.calls
+
@@ -0,0 +1,14 @@
+"""
+Fake of the maya.OpenMayaUI subset used by the package. There is no Qt main window, controls are never found.
+"""
+
+
+class MQtUtil(object):
+
+    @staticmethod
+    def findControl(name, *args):
+        return None
+
+    @staticmethod
+    def mainWindow():
+        return None
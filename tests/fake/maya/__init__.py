@@ -0,0 +1,3 @@
+"""
+In-memory stand-in of the maya package, so the rig tools can be tested and benchmarked without Maya.
+"""
@@ -0,0 +1,530 @@
+"""
+In-memory scene shared by the fake maya.cmds and maya.api modules.
+
+Only what the package and its benchmarks rely on is modelled: a DAG of transforms, joints and shapes, dependency
+nodes with flat attributes and connections, selection, skinClusters holding dense weights, the scene messages the
+caches listen to, plug-in commands and their undo chunks. Transforms only translate.
+"""
+import fnmatch
+import re
+
+# Types and the types they inherit from, from the most generic to the most specific
+TYPES = {
+    'world': ('world',),
+    'transform': ('dagNode', 'transform'),
+    'joint': ('dagNode', 'transform', 'joint'),
+    'mesh': ('dagNode', 'shape', 'deformableShape', 'controlPoint', 'surfaceShape', 'mesh'),
+    'nurbsCurve': ('dagNode', 'shape', 'deformableShape', 'controlPoint', 'curveShape', 'nurbsCurve'),
+    'skinCluster': ('geometryFilter', 'skinCluster'),
+    'controller': ('controller',),
+    'objectSet': ('entity', 'objectSet'),
+    'network': ('network',),
+    'animCurveTL': ('animCurve', 'animCurveTL'),
+    'animCurveTU': ('animCurve', 'animCurveTU'),
+}
+
+# Attribute defaults of each type, by short name
+ATTRIBUTES = {
+    'dagNode': {'v': True, 'overrideEnabled': False, 'overrideDisplayType': 0, 'overrideColor': 0, 'message': None},
+    'transform': {
+        'tx': 0.0, 'ty': 0.0, 'tz': 0.0, 'rx': 0.0, 'ry': 0.0, 'rz': 0.0, 'sx': 1.0, 'sy': 1.0, 'sz': 1.0,
+        'shxy': 0.0, 'shxz': 0.0, 'shyz': 0.0, 'worldMatrix': None,
+    },
+    'joint': {
+        'jox': 0.0, 'joy': 0.0, 'joz': 0.0, 'isx': 1.0, 'isy': 1.0, 'isz': 1.0,
+        'radius': 1.0, 'drawStyle': 0, 'displayLocalAxis': False,
+    },
+    'shape': {'intermediateObject': False, 'inMesh': None, 'create': None},
+    'skinCluster': {
+        'skinningMethod': 0, 'useComponents': False, 'deformUserNormals': True, 'dqsSupportNonRigid': False,
+        'dqsScaleX': 1.0, 'dqsScaleY': 1.0, 'dqsScaleZ': 1.0, 'normalizeWeights': 1, 'weightDistribution': 0,
+        'maintainMaxInfluences': False, 'maxInfluences': 5, 'envelope': 1.0, 'matrix': None, 'outputGeometry': None,
+    },
+    'controller': {'controllerObject': None, 'message': None},
+    'objectSet': {'message': None},
+    'network': {'message': None},
+    'animCurve': {'output': 0.0, 'message': None},
+}
+
+ALIASES = {
+    'translateX': 'tx', 'translateY': 'ty', 'translateZ': 'tz',
+    'rotateX': 'rx', 'rotateY': 'ry', 'rotateZ': 'rz',
+    'scaleX': 'sx', 'scaleY': 'sy', 'scaleZ': 'sz',
+    'shearXY': 'shxy', 'shearXZ': 'shxz', 'shearYZ': 'shyz',
+    'jointOrientX': 'jox', 'jointOrientY': 'joy', 'jointOrientZ': 'joz',
+    'inverseScaleX': 'isx', 'inverseScaleY': 'isy', 'inverseScaleZ': 'isz',
+    'visibility': 'v', 'io': 'intermediateObject',
+    'ove': 'overrideEnabled', 'ovdt': 'overrideDisplayType', 'ovc': 'overrideColor',
+    'dla': 'displayLocalAxis', 'ds': 'drawStyle', 'radi': 'radius',
+}
+
+COMPOUNDS = {
+    't': ('tx', 'ty', 'tz'), 'translate': ('tx', 'ty', 'tz'),
+    'r': ('rx', 'ry', 'rz'), 'rotate': ('rx', 'ry', 'rz'),
+    's': ('sx', 'sy', 'sz'), 'scale': ('sx', 'sy', 'sz'),
+    'sh': ('shxy', 'shxz', 'shyz'), 'shear': ('shxy', 'shxz', 'shyz'),
+    'jo': ('jox', 'joy', 'joz'), 'jointOrient': ('jox', 'joy', 'joz'),
+    'is': ('isx', 'isy', 'isz'), 'inverseScale': ('isx', 'isy', 'isz'),
+}
+
+COMPONENT = re.compile(r'^(\w+)\[(\d+)(?::(\d+))?\]$')
+
+
+class Attributes(dict):
+    """
+    Attribute values of a node, falling back on the defaults of its type so nodes only store what was set.
+    """
+    __slots__ = ('defaults',)
+
+    def __init__(self, defaults):
+        dict.__init__(self)
+        self.defaults = defaults
+
+    def __missing__(self, attr):
+        return self.defaults[attr]
+
+    def __contains__(self, attr):
+        return dict.__contains__(self, attr) or attr in self.defaults
+
+    def get(self, attr, default=None):
+        return self[attr] if attr in self else default
+
+
+DEFAULTS = dict()
+
+
+def get_defaults(node_type):
+    defaults = DEFAULTS.get(node_type)
+    if defaults is None:
+        defaults = dict()
+        for type_ in TYPES[node_type]:
+            defaults.update(ATTRIBUTES.get(type_, dict()))
+        DEFAULTS[node_type] = defaults
+    return defaults
+
+
+class Node(object):
+    __slots__ = ('type', 'types', 'name', 'parent', 'children', 'alive', 'locked', 'attrs', 'data')
+
+    def __init__(self, node_type, name, parent=None):
+        self.type = node_type
+        self.types = TYPES[node_type]
+        self.name = name
+        self.parent = parent
+        self.children = list()
+        self.alive = True
+        self.locked = frozenset()
+        self.attrs = Attributes(get_defaults(node_type))
+
+        # Type specific data: points and polygons of a mesh, CVs of a curve, skinCluster influences, geometry and
+        # weights, set members
+        self.data = dict()
+
+    def __repr__(self):
+        return '<{0} {1}>'.format(self.type, self.path())
+
+    def is_a(self, node_type):
+        return node_type in self.types
+
+    @property
+    def is_dag(self):
+        return 'dagNode' in self.types
+
+    def path(self):
+        if not self.is_dag:
+            return self.name
+
+        names = list()
+        node = self
+        while node is not None:
+            names.append(node.name)
+            node = node.parent
+        return '|' + '|'.join(reversed(names))
+
+    def get_shapes(self):
+        return [child for child in self.children if child.is_a('shape')]
+
+
+class Component(object):
+    """
+    Indices of the points of a shape, all of them when complete.
+    """
+
+    def __init__(self, component_type, elements=None, complete=None):
+        self.type = component_type
+        self.elements = list(elements or list())
+        self.complete = complete
+
+    def get_elements(self):
+        return list(range(self.complete)) if self.complete is not None else list(self.elements)
+
+
+class Scene(object):
+
+    def __init__(self):
+        self.world = Node('world', '')
+        self.callbacks = dict()
+        self.next_callback = 1
+        self.plugins = dict()
+        self.panels = {
+            'modelPanel1': {'visible': False}, 'modelPanel2': {'visible': False},
+            'modelPanel3': {'visible': False}, 'modelPanel4': {'visible': True},
+        }
+        self.focus = 'modelPanel4'
+        self.new()
+
+    def new(self):
+        for node in getattr(self, 'nodes', dict()).values():
+            node.alive = False
+        self.world.children = list()
+        self.nodes = dict()
+        self.by_name = dict()
+        self.dag_names = set()
+        self.sources = dict()
+        self.destinations = dict()
+        self.selection = list()
+        self.deferred = list()
+        self.mel_commands = list()
+        self.warnings = list()
+        self.undo_queue = list()
+        self.chunk = None
+        self.chunk_depth = 0
+        for flags in self.panels.values():
+            for flag in list(flags):
+                if flag != 'visible':
+                    del flags[flag]
+
+        self.emit('scene', 'afterNew')
+
+    # Callbacks
+
+    def add_callback(self, kind, func, filter_=None):
+        callback_id = self.next_callback
+        self.next_callback += 1
+        self.callbacks[callback_id] = (kind, func, filter_)
+        return callback_id
+
+    def remove_callback(self, callback_id):
+        self.callbacks.pop(callback_id, None)
+
+    def emit(self, kind, *args, **kwargs):
+        if not self.callbacks:
+            return
+        from .api import OpenMaya
+
+        node = kwargs.get('node')
+        for callback_kind, func, filter_ in list(self.callbacks.values()):
+            if callback_kind != kind:
+                continue
+            if kind == 'scene':
+                if filter_ == args[0]:
+                    func(None)
+            elif kind in ('added', 'removed'):
+                if filter_ in (None, 'dependNode') or node.is_a(filter_):
+                    func(OpenMaya.MObject(node), None)
+            elif kind == 'name':
+                func(OpenMaya.MObject(node), args[0], None)
+            elif kind == 'connection':
+                source, destination, made = args
+                func(OpenMaya.MPlug(*source), OpenMaya.MPlug(*destination), made, None)
+
+    # Nodes
+
+    def get_unique_name(self, name, parent=None):
+        """
+        Names of DAG nodes are unique among their siblings, the others in the whole scene.
+        """
+        if parent is not None:
+            is_used = lambda candidate: (id(parent), candidate) in self.dag_names
+        else:
+            is_used = self.by_name.get
+
+        if not is_used(name):
+            return name
+
+        base = name.rstrip('0123456789')
+        number = 1
+        while is_used('{0}{1}'.format(base, number)):
+            number += 1
+        return '{0}{1}'.format(base, number)
+
+    def create(self, node_type, name=None, parent=None):
+        node = Node(node_type, None)
+        holder = (parent or self.world) if node.is_dag else None
+        node.name = self.get_unique_name(name or '{0}1'.format(node_type), holder)
+
+        if holder is not None:
+            node.parent = parent
+            holder.children.append(node)
+            self.dag_names.add((id(holder), node.name))
+        self.nodes[id(node)] = node
+        self.by_name.setdefault(node.name, list()).append(node)
+
+        self.emit('added', node=node)
+        return node
+
+    def reparent(self, node, parent=None):
+        """
+        Move a DAG node under another one or under the world, renaming it if its name is taken there.
+        """
+        holder = node.parent or self.world
+        holder.children.remove(node)
+        self.dag_names.discard((id(holder), node.name))
+        self.by_name[node.name].remove(node)
+        if not self.by_name[node.name]:
+            del self.by_name[node.name]
+
+        holder = parent or self.world
+        node.name = self.get_unique_name(node.name, holder)
+        node.parent = parent
+        holder.children.append(node)
+        self.dag_names.add((id(holder), node.name))
+        self.by_name.setdefault(node.name, list()).append(node)
+
+    def delete(self, node):
+        for child in list(node.children):
+            self.delete(child)
+
+        self.emit('removed', node=node)
+        for destination, source in list(self.sources.items()):
+            if destination[0] is node or source[0] is node:
+                self.disconnect(source, destination)
+        if node.is_a('skinCluster'):
+            node.data['geometry'].data['skin_clusters'].remove(node)
+
+        if node.is_dag:
+            holder = node.parent or self.world
+            holder.children.remove(node)
+            self.dag_names.discard((id(holder), node.name))
+        self.by_name[node.name].remove(node)
+        if not self.by_name[node.name]:
+            del self.by_name[node.name]
+        del self.nodes[id(node)]
+        node.alive = False
+
+    def get_parent(self, node):
+        return node.parent or self.world
+
+    def lookup(self, name):
+        """
+        Resolve a node name, partial or full path.
+        :return: Node
+        """
+        short_name = name.rpartition('|')[-1]
+        nodes = self.by_name.get(short_name, list())
+        if '|' in name:
+            nodes = [node for node in nodes if node.path() == name or node.path().endswith('|' + name)]
+        if not nodes:
+            raise ValueError('No object matches name: {0}'.format(name))
+        if len(nodes) > 1:
+            raise ValueError('More than one object matches name: {0}'.format(name))
+        return nodes[0]
+
+    def parse(self, name):
+        """
+        Resolve a node, plug or component name.
+        :return: tuple, (Node, attribute or None, Component or None)
+        """
+        node_name, _, attr = name.partition('.')
+        node = self.lookup(node_name)
+        if not attr:
+            return node, None, None
+
+        match = COMPONENT.match(attr)
+        if match and match.group(1) in ('vtx', 'cv'):
+            shape = node if node.is_a('shape') else node.get_shapes()[0]
+            start = int(match.group(2))
+            end = int(match.group(3)) if match.group(3) is not None else start
+            component_type = 'vtx' if shape.is_a('mesh') else 'cv'
+            return shape, None, Component(component_type, range(start, end + 1))
+
+        attr = get_attr_name(attr)
+        if attr not in node.attrs and attr not in COMPOUNDS:
+            raise ValueError('No object matches name: {0}'.format(name))
+        return node, attr, None
+
+    def get_display_name(self, node):
+        """
+        Shortest unique name of a node, like ls returns it.
+        """
+        if not node.is_dag or len(self.by_name[node.name]) == 1:
+            return node.name
+
+        path = node.path()
+        names = path.split('|')
+        for depth in range(2, len(names)):
+            name = '|'.join(names[-depth:])
+            if not [other for other in self.by_name[node.name] if other is not node and other.path().endswith('|' + name)]:
+                return name
+        return path
+
+    def get_name(self, node, long=False):
+        return node.path() if long else self.get_display_name(node)
+
+    def iter_nodes(self):
+        return list(self.nodes.values())
+
+    def match(self, pattern):
+        """
+        :param pattern: str, name or glob pattern
+        :return: list of Node
+        """
+        if not any(char in pattern for char in '*?['):
+            try:
+                return [self.lookup(pattern)]
+            except ValueError:
+                return list()
+
+        if '|' in pattern:
+            return [node for node in self.iter_nodes() if fnmatch.fnmatchcase(node.path(), pattern)]
+        return [node for node in self.iter_nodes() if fnmatch.fnmatchcase(node.name, pattern)]
+
+    # Attributes and connections
+
+    def is_free(self, node, attr):
+        if attr in node.locked or (node, attr) in self.sources:
+            return False
+        compound = [name for name, children in COMPOUNDS.items() if attr in children]
+        return not [name for name in compound if (node, name) in self.sources or name in node.locked]
+
+    def get_value(self, node, attr):
+        if attr in COMPOUNDS:
+            return [tuple(node.attrs[child] for child in COMPOUNDS[attr])]
+        return node.attrs[attr]
+
+    def set_value(self, node, attr, value):
+        if attr in COMPOUNDS:
+            for child, child_value in zip(COMPOUNDS[attr], value):
+                node.attrs[child] = child_value
+        else:
+            node.attrs[attr] = value
+
+    def connect(self, source, destination):
+        if destination in self.sources:
+            self.disconnect(self.sources[destination], destination)
+        self.sources[destination] = source
+        self.destinations.setdefault(source, list()).append(destination)
+        self.emit('connection', source, destination, True)
+
+    def disconnect(self, source, destination):
+        if self.sources.get(destination) != source:
+            return
+        del self.sources[destination]
+        self.destinations[source].remove(destination)
+        self.emit('connection', source, destination, False)
+
+    # Selection
+
+    @staticmethod
+    def get_selection_key(item):
+        node, attr, component = item
+        return id(node), attr, tuple(component.get_elements()) if component is not None else None
+
+    def select(self, items, add=False):
+        if not add:
+            self.selection = list()
+        keys = {self.get_selection_key(item) for item in self.selection}
+        for item in items:
+            key = self.get_selection_key(item)
+            if key not in keys:
+                keys.add(key)
+                self.selection.append(item)
+
+    # Geometry and skinning
+
+    def get_world_offset(self, node):
+        offset = [0.0, 0.0, 0.0]
+        node = node.parent
+        while node is not None:
+            for index, attr in enumerate(('tx', 'ty', 'tz')):
+                offset[index] += node.attrs[attr]
+            node = node.parent
+        return offset
+
+    def get_points(self, shape, world=False):
+        points = shape.data['points']
+        if not world:
+            return list(points)
+
+        x, y, z = self.get_world_offset(shape)
+        return [(px + x, py + y, pz + z) for px, py, pz in points]
+
+    def get_skin_clusters(self, shape):
+        return list(shape.data.get('skin_clusters', list()))
+
+    def create_skin_cluster(self, shape, influences, weights=None, name=None):
+        """
+        Bind a shape to influences, its points being fully weighted to the first one when no weights are given.
+        :return: Node
+        """
+        if self.get_skin_clusters(shape):
+            raise RuntimeError('{0} is already connected to a skinCluster.'.format(shape.name))
+
+        skin_cluster = self.create('skinCluster', name=name or 'skinCluster1')
+        count = len(influences)
+        if weights is None:
+            weights = [0.0] * (len(shape.data['points']) * count)
+            weights[::count] = [1.0] * len(shape.data['points'])
+        skin_cluster.data.update(influences=list(influences), geometry=shape, weights=list(weights))
+        shape.data.setdefault('skin_clusters', list()).append(skin_cluster)
+
+        self.emit('connection', (skin_cluster, 'outputGeometry'), (shape, 'inMesh'), True)
+        for influence in influences:
+            self.emit('connection', (influence, 'worldMatrix'), (skin_cluster, 'matrix'), True)
+        return skin_cluster
+
+    def add_influences(self, skin_cluster, influences):
+        data = skin_cluster.data
+        count = len(data['influences'])
+        new_count = count + len(influences)
+        weights = [0.0] * (len(data['weights']) // count * new_count)
+        for index in range(count):
+            weights[index::new_count] = data['weights'][index::count]
+        data.update(influences=data['influences'] + list(influences), weights=weights)
+        for influence in influences:
+            self.emit('connection', (influence, 'worldMatrix'), (skin_cluster, 'matrix'), True)
+
+    def remove_influences(self, skin_cluster, influences):
+        data = skin_cluster.data
+        count = len(data['influences'])
+        kept = [index for index, influence in enumerate(data['influences']) if influence not in influences]
+        weights = [0.0] * (len(data['weights']) // count * len(kept))
+        for position, index in enumerate(kept):
+            weights[position::len(kept)] = data['weights'][index::count]
+        data.update(influences=[data['influences'][index] for index in kept], weights=weights)
+        for influence in influences:
+            self.emit('connection', (influence, 'worldMatrix'), (skin_cluster, 'matrix'), False)
+
+    # Undo
+
+    def open_chunk(self):
+        if not self.chunk_depth:
+            self.chunk = list()
+        self.chunk_depth += 1
+
+    def close_chunk(self):
+        self.chunk_depth = max(self.chunk_depth - 1, 0)
+        if not self.chunk_depth and self.chunk is not None:
+            if self.chunk:
+                self.undo_queue.append(self.chunk)
+            self.chunk = None
+
+    def record_undo(self, command):
+        if self.chunk is not None:
+            self.chunk.append(command)
+        else:
+            self.undo_queue.append([command])
+
+    def undo(self):
+        if not self.undo_queue:
+            return False
+        for command in reversed(self.undo_queue.pop()):
+            command.undoIt()
+        return True
+
+
+def get_attr_name(attr):
+    return ALIASES.get(attr, attr)
+
+
+scene = Scene()
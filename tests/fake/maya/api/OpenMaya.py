@@ -0,0 +1,907 @@
+"""
+Fake of the maya.api.OpenMaya subset used by the package, working on the in-memory scene.
+"""
+import importlib.util
+import math
+from .._scene import scene, Component, COMPOUNDS, get_attr_name
+
+
+class MFn(object):
+    kInvalid = 0
+    kBase = 1
+    kDependencyNode = 2
+    kDagNode = 3
+    kWorld = 4
+    kTransform = 5
+    kJoint = 6
+    kShape = 7
+    kMesh = 8
+    kNurbsCurve = 9
+    kNurbsSurface = 10
+    kLattice = 11
+    kGeometryFilt = 12
+    kSkinClusterFilter = 13
+    kSet = 14
+    kComponent = 15
+    kMeshVertComponent = 16
+    kCurveCVComponent = 17
+    kSurfaceCVComponent = 18
+    kLatticeComponent = 19
+    kAnimCurve = 20
+
+
+FUNCTION_SETS = {
+    'world': {MFn.kWorld},
+    'dagNode': {MFn.kDependencyNode, MFn.kDagNode},
+    'transform': {MFn.kTransform},
+    'joint': {MFn.kJoint},
+    'shape': {MFn.kShape},
+    'mesh': {MFn.kMesh},
+    'nurbsCurve': {MFn.kNurbsCurve},
+    'geometryFilter': {MFn.kDependencyNode, MFn.kGeometryFilt},
+    'skinCluster': {MFn.kSkinClusterFilter},
+    'objectSet': {MFn.kDependencyNode, MFn.kSet},
+    'controller': {MFn.kDependencyNode},
+    'network': {MFn.kDependencyNode},
+    'animCurve': {MFn.kDependencyNode, MFn.kAnimCurve},
+}
+
+COMPONENT_TYPES = {'vtx': MFn.kMeshVertComponent, 'cv': MFn.kCurveCVComponent}
+
+
+def get_function_sets(node):
+    function_sets = {MFn.kBase}
+    for type_ in node.types:
+        function_sets.update(FUNCTION_SETS.get(type_, set()))
+    return function_sets
+
+
+class MSpace(object):
+    kInvalid = 0
+    kTransform = 1
+    kPreTransform = 2
+    kPostTransform = 3
+    kWorld = 4
+    kObject = kPreTransform
+
+
+class MDoubleArray(list):
+
+    def __init__(self, *args):
+        # Built from a sequence, or as a number of copies of one value
+        if len(args) == 2:
+            list.__init__(self, [float(args[1])] * args[0])
+        else:
+            list.__init__(self, *args)
+
+
+class MIntArray(list):
+
+    def __init__(self, *args):
+        if len(args) == 2:
+            list.__init__(self, [int(args[1])] * args[0])
+        else:
+            list.__init__(self, *args)
+
+
+class MPointArray(list):
+    pass
+
+
+class MDagPathArray(list):
+    pass
+
+
+class MObjectArray(list):
+    pass
+
+
+class MPoint(object):
+
+    def __init__(self, x=0.0, y=0.0, z=0.0, w=1.0):
+        if isinstance(x, (tuple, list, MPoint)):
+            x, y, z = tuple(x)[:3]
+        self.x, self.y, self.z, self.w = float(x), float(y), float(z), float(w)
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z, self.w)[index]
+
+    def __len__(self):
+        return 4
+
+    def __repr__(self):
+        return 'MPoint({0}, {1}, {2})'.format(self.x, self.y, self.z)
+
+
+class MVector(MPoint):
+    pass
+
+
+class MMatrix(object):
+    """
+    Row major 4x4 matrix, points being row vectors as in Maya.
+    """
+
+    def __init__(self, values=None):
+        self.values = list(values) if values is not None else [
+            1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0
+        ]
+
+    @classmethod
+    def translation(cls, x, y, z):
+        return cls([1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, x, y, z, 1.0])
+
+    def __mul__(self, other):
+        a, b = self.values, other.values
+        return MMatrix([
+            sum(a[row * 4 + index] * b[index * 4 + column] for index in range(4))
+            for row in range(4) for column in range(4)
+        ])
+
+    def __rmul__(self, point):
+        # Point (row vector) times matrix
+        m = self.values
+        x, y, z = point.x, point.y, point.z
+        return MPoint(
+            x * m[0] + y * m[4] + z * m[8] + m[12],
+            x * m[1] + y * m[5] + z * m[9] + m[13],
+            x * m[2] + y * m[6] + z * m[10] + m[14],
+        )
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def inverse(self):
+        # Gauss-Jordan elimination with partial pivoting
+        rows = [self.values[row * 4:row * 4 + 4] + [1.0 if row == column else 0.0 for column in range(4)]
+                for row in range(4)]
+        for column in range(4):
+            pivot = max(range(column, 4), key=lambda row: abs(rows[row][column]))
+            if abs(rows[pivot][column]) < 1e-12:
+                raise RuntimeError('Singular matrix')
+            rows[column], rows[pivot] = rows[pivot], rows[column]
+            factor = rows[column][column]
+            rows[column] = [value / factor for value in rows[column]]
+            for row in range(4):
+                if row != column:
+                    ratio = rows[row][column]
+                    rows[row] = [value - ratio * pivot_value for value, pivot_value in zip(rows[row], rows[column])]
+        return MMatrix([value for row in rows for value in row[4:]])
+
+    def isEquivalent(self, other, tolerance=1e-10):
+        return all(abs(a - b) <= tolerance for a, b in zip(self.values, other.values))
+
+
+class MObject(object):
+    kNullObj = None
+
+    def __init__(self, node=None, component=None):
+        if isinstance(node, MObject):
+            node, component = node._node, node._component
+        self._node = node
+        self._component = component
+
+    def isNull(self):
+        return self._node is None and self._component is None
+
+    def hasFn(self, function_set):
+        if self._component is not None:
+            return function_set in (MFn.kComponent, COMPONENT_TYPES.get(self._component.type))
+        if self._node is None:
+            return False
+        return function_set in get_function_sets(self._node)
+
+    def apiType(self):
+        if self._component is not None:
+            return COMPONENT_TYPES.get(self._component.type, MFn.kComponent)
+        return max(get_function_sets(self._node)) if self._node is not None else MFn.kInvalid
+
+    def __eq__(self, other):
+        return isinstance(other, MObject) and self._node is other._node and self._component is other._component
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+
+MObject.kNullObj = MObject()
+
+
+class MObjectHandle(object):
+
+    def __init__(self, mobject=None):
+        self._object = MObject(mobject) if mobject is not None else MObject()
+
+    def object(self):
+        return self._object if self.isValid() else MObject()
+
+    def isValid(self):
+        return self._object._node is not None and self._object._node.alive
+
+    def isAlive(self):
+        return self.isValid()
+
+    def hashCode(self):
+        return id(self._object._node) & 0xffffffff
+
+
+class MDagPath(object):
+
+    def __init__(self, node=None):
+        if isinstance(node, MDagPath):
+            node = node._node
+        self._node = node
+
+    @classmethod
+    def getAPathTo(cls, mobject):
+        return cls(mobject._node)
+
+    @classmethod
+    def getAllPathsTo(cls, mobject):
+        return MDagPathArray([cls(mobject._node)])
+
+    def node(self):
+        return MObject(self._node)
+
+    def transform(self):
+        node = self._node
+        return MObject(node if node.is_a('transform') else node.parent)
+
+    def hasFn(self, function_set):
+        return MObject(self._node).hasFn(function_set)
+
+    def apiType(self):
+        return MObject(self._node).apiType()
+
+    def fullPathName(self):
+        return self._node.path()
+
+    def partialPathName(self):
+        return scene.get_display_name(self._node)
+
+    def isValid(self):
+        return self._node is not None and self._node.alive
+
+    def inclusiveMatrix(self):
+        offset = scene.get_world_offset(self._node)
+        if self._node.is_a('transform'):
+            offset = [value + self._node.attrs[attr] for value, attr in zip(offset, ('tx', 'ty', 'tz'))]
+        return MMatrix.translation(*offset)
+
+    def exclusiveMatrix(self):
+        return MMatrix.translation(*scene.get_world_offset(self._node))
+
+    def inclusiveMatrixInverse(self):
+        return self.inclusiveMatrix().inverse()
+
+    def exclusiveMatrixInverse(self):
+        return self.exclusiveMatrix().inverse()
+
+    def __eq__(self, other):
+        return isinstance(other, MDagPath) and self._node is other._node
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+
+class MPlug(object):
+    kFreeToChange = 0
+    kNotFreeToChange = 1
+    kChildrenNotFreeToChange = 2
+
+    def __init__(self, node=None, attr=None):
+        self._node = node
+        self._attr = attr
+
+    def node(self):
+        return MObject(self._node)
+
+    def name(self):
+        return '{0}.{1}'.format(scene.get_display_name(self._node), self._attr)
+
+    def partialName(self, *args, **kwargs):
+        return self._attr
+
+    def isNull(self):
+        return self._node is None
+
+    def isFreeToChange(self, *args, **kwargs):
+        return MPlug.kFreeToChange if scene.is_free(self._node, self._attr) else MPlug.kNotFreeToChange
+
+    @property
+    def isLocked(self):
+        # A compound can be locked under any of its names
+        children = COMPOUNDS.get(self._attr)
+        names = {name for name, value in COMPOUNDS.items() if children and value == children}
+        return bool(({self._attr} | names) & self._node.locked)
+
+    @property
+    def isChild(self):
+        return any(self._attr in children for children in COMPOUNDS.values())
+
+    def parent(self):
+        for name, children in COMPOUNDS.items():
+            if self._attr in children:
+                return MPlug(self._node, name)
+        raise RuntimeError('(kFailure): Plug is not a child')
+
+    @property
+    def isDestination(self):
+        return (self._node, self._attr) in scene.sources
+
+    @property
+    def isSource(self):
+        return bool(scene.destinations.get((self._node, self._attr)))
+
+    def source(self):
+        source = scene.sources.get((self._node, self._attr))
+        return MPlug(*source) if source else MPlug()
+
+    def asBool(self):
+        return bool(self._node.attrs[self._attr])
+
+    def asInt(self):
+        return int(self._node.attrs[self._attr])
+
+    def asDouble(self):
+        return float(self._node.attrs[self._attr])
+
+    def child(self, index):
+        return MPlug(self._node, COMPOUNDS[self._attr][index])
+
+    def numChildren(self):
+        return len(COMPOUNDS.get(self._attr, ()))
+
+    def __eq__(self, other):
+        return isinstance(other, MPlug) and self._node is other._node and self._attr == other._attr
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+
+class MSelectionList(object):
+
+    def __init__(self, other=None):
+        self._items = list(other._items) if other is not None else list()
+
+    def add(self, item, mergeWithExisting=True):
+        if isinstance(item, MDagPath):
+            entry = (item._node, None, None)
+        elif isinstance(item, MObject):
+            entry = (item._node, None, None)
+        elif isinstance(item, MPlug):
+            entry = (item._node, item._attr, None)
+        elif isinstance(item, tuple):
+            path, component = item
+            entry = (path._node, None, component._component)
+        else:
+            try:
+                entry = scene.parse(item)
+            except (ValueError, IndexError):
+                raise RuntimeError('(kInvalidParameter): Object does not exist')
+        self._items.append(entry)
+        return self
+
+    def length(self):
+        return len(self._items)
+
+    def isEmpty(self):
+        return not self._items
+
+    def clear(self):
+        self._items = list()
+        return self
+
+    def getDependNode(self, index):
+        return MObject(self._items[index][0])
+
+    def getDagPath(self, index):
+        node = self._items[index][0]
+        if not node.is_dag:
+            raise TypeError('Item is not a DAG path')
+        return MDagPath(node)
+
+    def getComponent(self, index):
+        node, _, component = self._items[index]
+        if not node.is_dag:
+            raise TypeError('Item is not a DAG path')
+        return MDagPath(node), MObject(None, component) if component is not None else MObject()
+
+    def getPlug(self, index):
+        node, attr, _ = self._items[index]
+        if attr is None:
+            raise TypeError('Item is not a plug')
+        return MPlug(node, attr)
+
+    def getSelectionStrings(self, index=None):
+        items = self._items if index is None else [self._items[index]]
+        return [scene.get_display_name(node) + ('.' + attr if attr else '') for node, attr, _ in items]
+
+
+class MGlobal(object):
+
+    @staticmethod
+    def getActiveSelectionList(orderedSelectionIfAvailable=False):
+        selection = MSelectionList()
+        selection._items = list(scene.selection)
+        return selection
+
+    @staticmethod
+    def setActiveSelectionList(selection, listAdjustment=0):
+        scene.select(selection._items)
+
+    @staticmethod
+    def displayWarning(message):
+        scene.warnings.append(message)
+
+
+class MFnBase(object):
+
+    def __init__(self, mobject=None):
+        self._node = None
+        self._path = None
+        if mobject is not None:
+            self.setObject(mobject)
+
+    def setObject(self, mobject):
+        if isinstance(mobject, MDagPath):
+            self._path = mobject
+            mobject = mobject.node()
+        self._node = mobject._node
+        return self
+
+    def object(self):
+        return MObject(self._node)
+
+
+class MFnDependencyNode(MFnBase):
+
+    @property
+    def typeName(self):
+        return self._node.type
+
+    def name(self):
+        return self._node.name
+
+    def hasAttribute(self, attr):
+        attr = get_attr_name(attr)
+        return attr in self._node.attrs or attr in COMPOUNDS
+
+    def findPlug(self, attr, wantNetworkedPlug=False):
+        if not self.hasAttribute(attr):
+            raise RuntimeError('(kInvalidParameter): No attribute \'{0}\''.format(attr))
+        return MPlug(self._node, get_attr_name(attr))
+
+
+class MFnDagNode(MFnDependencyNode):
+
+    def fullPathName(self):
+        return self._node.path()
+
+    def partialPathName(self):
+        return scene.get_display_name(self._node)
+
+    def parentCount(self):
+        return 1 if self._node is not scene.world else 0
+
+    def parent(self, index=0):
+        return MObject(scene.get_parent(self._node))
+
+    def childCount(self):
+        return len(self._node.children)
+
+    def child(self, index):
+        return MObject(self._node.children[index])
+
+    def getPath(self):
+        return MDagPath(self._node)
+
+
+class MFnTransform(MFnDagNode):
+    pass
+
+
+class MFnComponent(MFnBase):
+    component_class = None
+
+    def create(self, component_type):
+        names = {value: name for name, value in COMPONENT_TYPES.items()}
+        self._component = Component(names.get(component_type, 'vtx'))
+        return MObject(None, self._component)
+
+    def setObject(self, mobject):
+        self._component = mobject._component
+        return self
+
+    def setCompleteData(self, count):
+        self._component.complete = count
+        self._component.elements = list()
+        return self
+
+    def getElements(self):
+        return MIntArray(self._component.get_elements())
+
+    def addElements(self, elements):
+        self._component.elements.extend(elements)
+        return self
+
+    @property
+    def elementCount(self):
+        return len(self._component.get_elements())
+
+    @property
+    def isComplete(self):
+        return self._component.complete is not None
+
+
+class MFnSingleIndexedComponent(MFnComponent):
+    pass
+
+
+def get_points(path, space):
+    points = scene.get_points(path._node, world=space == MSpace.kWorld)
+    return MPointArray(MPoint(*point) for point in points)
+
+
+class MFnMesh(MFnDagNode):
+
+    def setObject(self, mobject):
+        MFnDagNode.setObject(self, mobject)
+        if not self._node.is_a('mesh'):
+            raise RuntimeError('(kInvalidParameter): Object is incompatible with this method')
+        return self
+
+    @property
+    def numVertices(self):
+        return len(self._node.data['points'])
+
+    @property
+    def numPolygons(self):
+        return len(self._node.data['polygons'])
+
+    def getPoints(self, space=MSpace.kObject):
+        return get_points(self._path or MDagPath(self._node), space)
+
+    def getPolygonTriangleVertices(self, polygon, triangle):
+        vertices = self._node.data['polygons'][polygon]
+        return vertices[0], vertices[triangle + 1], vertices[triangle + 2]
+
+
+class MFnNurbsCurve(MFnDagNode):
+    kOpen = 1
+    kClosed = 2
+    kPeriodic = 3
+
+    @property
+    def numCVs(self):
+        return len(self._node.data['points'])
+
+    @property
+    def degree(self):
+        return self._node.data.get('degree', 3)
+
+    @property
+    def form(self):
+        return self._node.data.get('form', MFnNurbsCurve.kOpen)
+
+
+class MItGeometry(object):
+
+    def __init__(self, path, component=None):
+        self._path = path if isinstance(path, MDagPath) else MDagPath(path._node)
+
+    def count(self):
+        return len(self._path._node.data['points'])
+
+    def allPositions(self, space=MSpace.kObject):
+        return get_points(self._path, space)
+
+
+class MPointOnMesh(object):
+
+    def __init__(self, point, face, triangle, barycentric_coords):
+        self.point = point
+        self.face = face
+        self.triangle = triangle
+        self.barycentricCoords = barycentric_coords
+
+    def getPoint(self):
+        return self.point
+
+
+def get_closest_point_on_triangle(p, a, b, c):
+    """
+    Closest point of triangle abc to p, as the weights of a, b and c (from Real-Time Collision Detection).
+    """
+    ab = [b[i] - a[i] for i in range(3)]
+    ac = [c[i] - a[i] for i in range(3)]
+    ap = [p[i] - a[i] for i in range(3)]
+    dot = lambda u, v: u[0] * v[0] + u[1] * v[1] + u[2] * v[2]
+
+    d1, d2 = dot(ab, ap), dot(ac, ap)
+    if d1 <= 0.0 and d2 <= 0.0:
+        return 1.0, 0.0, 0.0
+
+    bp = [p[i] - b[i] for i in range(3)]
+    d3, d4 = dot(ab, bp), dot(ac, bp)
+    if d3 >= 0.0 and d4 <= d3:
+        return 0.0, 1.0, 0.0
+
+    vc = d1 * d4 - d3 * d2
+    if vc <= 0.0 and d1 >= 0.0 and d3 <= 0.0:
+        v = d1 / (d1 - d3)
+        return 1.0 - v, v, 0.0
+
+    cp = [p[i] - c[i] for i in range(3)]
+    d5, d6 = dot(ab, cp), dot(ac, cp)
+    if d6 >= 0.0 and d5 <= d6:
+        return 0.0, 0.0, 1.0
+
+    vb = d5 * d2 - d1 * d6
+    if vb <= 0.0 and d2 >= 0.0 and d6 <= 0.0:
+        w = d2 / (d2 - d6)
+        return 1.0 - w, 0.0, w
+
+    va = d3 * d6 - d5 * d4
+    if va <= 0.0 and (d4 - d3) >= 0.0 and (d5 - d6) >= 0.0:
+        w = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+        return 0.0, 1.0 - w, w
+
+    denominator = 1.0 / (va + vb + vc)
+    v, w = vb * denominator, vc * denominator
+    return 1.0 - v - w, v, w
+
+
+class MMeshIntersector(object):
+    """
+    Closest point queries through a uniform grid of the mesh vertices. The closest vertex is found first, then the
+    closest point on the triangles around it.
+    """
+
+    def create(self, mobject, matrix=None):
+        node = mobject._node
+        matrix = matrix or MMatrix()
+        self._points = [tuple(MPoint(*point) * matrix) for point in node.data['points']]
+        self._polygons = node.data['polygons']
+
+        self._triangles = dict()
+        for face, vertices in enumerate(self._polygons):
+            for triangle in range(len(vertices) - 2):
+                for vertex in (vertices[0], vertices[triangle + 1], vertices[triangle + 2]):
+                    self._triangles.setdefault(vertex, list()).append((face, triangle))
+
+        minimum = [min(point[i] for point in self._points) for i in range(3)]
+        maximum = [max(point[i] for point in self._points) for i in range(3)]
+        extent = max(maximum[i] - minimum[i] for i in range(3)) or 1.0
+        # Sized for surfaces, about one vertex per cell
+        self._cell = extent / max(len(self._points) ** 0.5, 1.0)
+        self._grid = dict()
+        for index, point in enumerate(self._points):
+            self._grid.setdefault(self.get_cell(point), list()).append(index)
+        return self
+
+    def get_cell(self, point):
+        return tuple(int(math.floor(value / self._cell)) for value in point)
+
+    def get_closest_vertex(self, point):
+        center = self.get_cell(point)
+        closest, distance = None, None
+        radius = 0
+        while closest is None or (radius - 1) * self._cell <= distance:
+            for cell in self.get_ring(center, radius):
+                for index in self._grid.get(cell, ()):
+                    candidate = sum((a - b) ** 2 for a, b in zip(self._points[index], point)) ** 0.5
+                    if distance is None or candidate < distance:
+                        closest, distance = index, candidate
+            radius += 1
+        return closest
+
+    @staticmethod
+    def get_ring(center, radius):
+        x, y, z = center
+        for i in range(-radius, radius + 1):
+            for j in range(-radius, radius + 1):
+                for k in range(-radius, radius + 1):
+                    if max(abs(i), abs(j), abs(k)) == radius:
+                        yield x + i, y + j, z + k
+
+    def getClosestPoint(self, point, maxDistance=None):
+        point = tuple(point)[:3]
+        best = None
+        for face, triangle in self._triangles.get(self.get_closest_vertex(point), ()):
+            vertices = self._polygons[face]
+            a, b, c = vertices[0], vertices[triangle + 1], vertices[triangle + 2]
+            u, v, w = get_closest_point_on_triangle(point, self._points[a], self._points[b], self._points[c])
+            position = [u * pa + v * pb + w * pc for pa, pb, pc in zip(self._points[a], self._points[b], self._points[c])]
+            distance = sum((p - q) ** 2 for p, q in zip(position, point))
+            if best is None or distance < best[0]:
+                best = (distance, MPointOnMesh(MPoint(*position), face, triangle, (u, v)))
+        return best[1]
+
+
+class MDGModifier(object):
+
+    def __init__(self):
+        self._operations = list()
+        self._undo = list()
+
+    def newPlugValueBool(self, plug, value):
+        self._operations.append(('set', plug, bool(value)))
+        return self
+
+    def newPlugValueInt(self, plug, value):
+        self._operations.append(('set', plug, int(value)))
+        return self
+
+    def newPlugValueDouble(self, plug, value):
+        self._operations.append(('set', plug, float(value)))
+        return self
+
+    def connect(self, source, destination):
+        self._operations.append(('connect', source, destination))
+        return self
+
+    def disconnect(self, source, destination):
+        self._operations.append(('disconnect', source, destination))
+        return self
+
+    def doIt(self):
+        self._undo = list()
+        for operation, first, second in self._operations:
+            if operation == 'set':
+                node, attr = first._node, first._attr
+                self._undo.append(('set', first, node.attrs[attr]))
+                node.attrs[attr] = second
+            elif operation == 'connect':
+                scene.connect((first._node, first._attr), (second._node, second._attr))
+                self._undo.append(('disconnect', first, second))
+            else:
+                scene.disconnect((first._node, first._attr), (second._node, second._attr))
+                self._undo.append(('connect', first, second))
+
+    def undoIt(self):
+        for operation, first, second in reversed(self._undo):
+            if operation == 'set':
+                first._node.attrs[first._attr] = second
+            elif operation == 'connect':
+                scene.connect((first._node, first._attr), (second._node, second._attr))
+            else:
+                scene.disconnect((first._node, first._attr), (second._node, second._attr))
+
+
+class MDagModifier(MDGModifier):
+    pass
+
+
+class MItDag(object):
+    kDepthFirst = 1
+    kBreadthFirst = 2
+
+    def __init__(self, traversalType=kDepthFirst, filterType=MFn.kInvalid):
+        self.reset(MObject(scene.world))
+
+    def reset(self, root, *args, **kwargs):
+        root = root._node if isinstance(root, (MObject, MDagPath)) else root
+        self._nodes = list()
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            self._nodes.append(node)
+            stack.extend(reversed(node.children))
+        self._index = 0
+        return self
+
+    def isDone(self):
+        return self._index >= len(self._nodes)
+
+    def next(self):
+        self._index += 1
+        return self
+
+    def currentItem(self):
+        return MObject(self._nodes[self._index])
+
+    def getPath(self):
+        return MDagPath(self._nodes[self._index])
+
+
+class MArgList(object):
+
+    def __init__(self, args=()):
+        self._args = list(args)
+
+    def length(self):
+        return len(self._args)
+
+    def asString(self, index):
+        return str(self._args[index])
+
+
+class MPxCommand(object):
+
+    def __init__(self):
+        pass
+
+    def isUndoable(self):
+        return False
+
+
+class MFnPlugin(object):
+
+    def __init__(self, mobject=None, vendor='', version='', apiVersion='Any'):
+        self._plugin = mobject
+
+    def registerCommand(self, name, creator, syntax=None):
+        from .. import cmds
+
+        def command(*args):
+            instance = creator()
+            instance.doIt(MArgList(args))
+            if instance.isUndoable():
+                scene.record_undo(instance)
+
+        cmds.register(name, command)
+
+    def deregisterCommand(self, name):
+        from .. import cmds
+
+        cmds.deregister(name)
+
+
+class MMessage(object):
+
+    @staticmethod
+    def removeCallback(callback_id):
+        scene.remove_callback(callback_id)
+
+    @staticmethod
+    def removeCallbacks(callback_ids):
+        for callback_id in callback_ids:
+            scene.remove_callback(callback_id)
+
+
+class MDGMessage(MMessage):
+
+    @staticmethod
+    def addNodeAddedCallback(func, nodeType='dependNode', clientData=None):
+        return scene.add_callback('added', func, nodeType)
+
+    @staticmethod
+    def addNodeRemovedCallback(func, nodeType='dependNode', clientData=None):
+        return scene.add_callback('removed', func, nodeType)
+
+    @staticmethod
+    def addConnectionCallback(func, clientData=None):
+        return scene.add_callback('connection', func)
+
+
+class MNodeMessage(MMessage):
+
+    @staticmethod
+    def addNameChangedCallback(node, func, clientData=None):
+        return scene.add_callback('name', func)
+
+
+class MSceneMessage(MMessage):
+    kAfterNew = 'afterNew'
+    kAfterOpen = 'afterOpen'
+
+    @staticmethod
+    def addCallback(message, func, clientData=None):
+        return scene.add_callback('scene', func, message)
+
+
+def load_plugin(file_path):
+    spec = importlib.util.spec_from_file_location('_fake_plugin_{0}'.format(len(scene.plugins)), file_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.initializePlugin(MObject())
+    return module
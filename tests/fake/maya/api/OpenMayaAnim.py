@@ -0,0 +1,57 @@
+"""
+Fake of the maya.api.OpenMayaAnim subset used by the package.
+"""
+from .OpenMaya import MFnDependencyNode, MDagPath, MDagPathArray, MObject, MObjectArray, MDoubleArray
+
+
+class MFnSkinCluster(MFnDependencyNode):
+
+    def setObject(self, mobject):
+        MFnDependencyNode.setObject(self, mobject)
+        if not self._node.is_a('skinCluster'):
+            raise RuntimeError('(kInvalidParameter): Object is incompatible with this method')
+        return self
+
+    def influenceObjects(self):
+        return MDagPathArray(MDagPath(influence) for influence in self._node.data['influences'])
+
+    def numOutputConnections(self):
+        return 1
+
+    def indexForOutputConnection(self, connection):
+        if connection != 0:
+            raise RuntimeError('(kInvalidParameter): Index not found')
+        return 0
+
+    def getPathAtIndex(self, index):
+        return MDagPath(self._node.data['geometry'])
+
+    def getOutputGeometry(self):
+        return MObjectArray([MObject(self._node.data['geometry'])])
+
+    def get_elements(self, shape, component):
+        if shape._node is not self._node.data['geometry']:
+            raise RuntimeError('(kInvalidParameter): Geometry is not deformed by this skinCluster')
+        return component._component.get_elements()
+
+    def getWeights(self, shape, component, *args):
+        weights = self._node.data['weights']
+        count = len(self._node.data['influences'])
+        values = MDoubleArray()
+        for element in self.get_elements(shape, component):
+            values.extend(weights[element * count:(element + 1) * count])
+        return values, count
+
+    def setWeights(self, shape, component, influences, values, normalize=True, returnOldWeights=False):
+        weights = self._node.data['weights']
+        count = len(self._node.data['influences'])
+        influence_count = len(influences)
+
+        old_values = MDoubleArray()
+        for position, element in enumerate(self.get_elements(shape, component)):
+            start = element * count
+            for index, influence in enumerate(influences):
+                if returnOldWeights:
+                    old_values.append(weights[start + influence])
+                weights[start + influence] = values[position * influence_count + index]
+        return old_values if returnOldWeights else None
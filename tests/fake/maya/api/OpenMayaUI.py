@@ -0,0 +1,11 @@
+"""
+Fake of the maya.api.OpenMayaUI subset used by the package.
+"""
+from .._scene import scene
+
+
+class M3dView(object):
+
+    @staticmethod
+    def numberOf3dViews():
+        return len(scene.panels)
@@ -0,0 +1,603 @@
+"""
+Fake of the maya.cmds subset used by the package, working on the in-memory scene.
+Every call is counted by command name in `calls`, so tests can check the number of round-trips to Maya.
+"""
+import math
+from collections import Counter
+from functools import wraps
+from ._scene import scene, COMPOUNDS, get_attr_name
+
+calls = Counter()
+
+
+def command(func):
+    name = func.__name__.rstrip('_')
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        calls[name] += 1
+        return func(*args, **kwargs)
+
+    globals()[name] = wrapper
+    return wrapper
+
+
+def register(name, func):
+    """
+    Add a command, as plug-ins do.
+    """
+    func.__name__ = name
+    command(func)
+
+
+def deregister(name):
+    globals().pop(name, None)
+
+
+def flatten(args):
+    items = list()
+    for arg in args:
+        if isinstance(arg, (list, tuple, set)):
+            items.extend(flatten(arg))
+        elif arg is not None:
+            items.append(arg)
+    return items
+
+
+def get_flag(kwargs, *names, **default):
+    for name in names:
+        if name in kwargs:
+            return kwargs[name]
+    return default.get('default')
+
+
+def get_component_name(component):
+    elements = sorted(component.get_elements())
+    ranges = list()
+    for element in elements:
+        if ranges and ranges[-1][1] == element - 1:
+            ranges[-1][1] = element
+        else:
+            ranges.append([element, element])
+    return ['{0}[{1}]'.format(component.type, start) if start == end else
+            '{0}[{1}:{2}]'.format(component.type, start, end) for start, end in ranges]
+
+
+def get_item_names(item, long=False):
+    node, attr, component = item
+    name = scene.get_name(node, long)
+    if component is not None:
+        return ['{0}.{1}'.format(name, part) for part in get_component_name(component)]
+    if attr is not None:
+        return ['{0}.{1}'.format(name, attr)]
+    return [name]
+
+
+def iter_dag(root=None):
+    stack = list(reversed((root or scene.world).children))
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(node.children))
+
+
+def resolve(items):
+    """
+    :param items: names, plugs, components or glob patterns
+    :return: list of (Node, attribute, Component) tuples
+    """
+    resolved = list()
+    for item in flatten(items):
+        if any(char in item for char in '*?['):
+            if '.' in item:
+                resolved.append(scene.parse(item))
+            else:
+                resolved.extend((node, None, None) for node in scene.match(item))
+        else:
+            resolved.append(scene.parse(item))
+    return resolved
+
+
+def get_shape(node):
+    if node.is_a('shape'):
+        return node
+    shapes = [shape for shape in node.get_shapes() if not shape.attrs['intermediateObject']]
+    if not shapes:
+        raise RuntimeError('No shape found under \'{0}\'.'.format(node.name))
+    return shapes[0]
+
+
+class SetAttrUndo(object):
+
+    def __init__(self, node, attr, value):
+        self.node = node
+        self.attr = attr
+        self.value = value
+
+    def undoIt(self):
+        scene.set_value(self.node, self.attr, self.value)
+
+
+@command
+def file_(*args, **kwargs):
+    if kwargs.get('new'):
+        scene.new()
+        return ''
+    if get_flag(kwargs, 'q', 'query'):
+        return ''
+    raise RuntimeError('file: only new and queries are supported.')
+
+
+@command
+def about(*args, **kwargs):
+    if kwargs.get('batch'):
+        return True
+    if kwargs.get('version') or kwargs.get('v'):
+        return '2024'
+    return ''
+
+
+@command
+def warning(message, *args, **kwargs):
+    scene.warnings.append(message)
+
+
+@command
+def objExists(name):
+    try:
+        scene.parse(name)
+    except (ValueError, IndexError):
+        return False
+    return True
+
+
+@command
+def objectType(name, isAType=None, isType=None, **kwargs):
+    node, _, _ = scene.parse(name)
+    if isAType is not None:
+        return node.is_a(isAType)
+    if isType is not None:
+        return node.type == isType
+    return node.type
+
+
+@command
+def ls(*args, **kwargs):
+    long = get_flag(kwargs, 'long', 'l', default=False)
+    node_types = get_flag(kwargs, 'type', 'typ')
+    if node_types is not None and not isinstance(node_types, (list, tuple)):
+        node_types = [node_types]
+
+    if get_flag(kwargs, 'sl', 'selection'):
+        items = list(scene.selection)
+        if args:
+            names = set(id(node) for node, _, _ in resolve(args))
+            items = [item for item in items if id(item[0]) in names]
+    elif args:
+        items = list()
+        for arg in flatten(args):
+            try:
+                items.extend(resolve([arg]))
+            except ValueError:
+                continue
+    elif get_flag(kwargs, 'dag', 'dagObjects'):
+        items = [(node, None, None) for node in iter_dag()]
+    else:
+        items = [(node, None, None) for node in scene.iter_nodes()]
+
+    names = list()
+    for item in items:
+        node = item[0]
+        if node_types is not None and not any(node.is_a(node_type) for node_type in node_types):
+            continue
+        if get_flag(kwargs, 'dag', 'dagObjects') and not node.is_dag:
+            continue
+        if get_flag(kwargs, 'noIntermediate', 'ni') and node.attrs.get('intermediateObject', False):
+            continue
+        names.extend(get_item_names(item, long))
+    return names
+
+
+@command
+def select(*args, **kwargs):
+    if get_flag(kwargs, 'clear', 'cl'):
+        scene.select(list())
+        return
+    items = resolve(args)
+    if get_flag(kwargs, 'deselect', 'd'):
+        keys = {scene.get_selection_key(item) for item in items}
+        scene.selection = [item for item in scene.selection if scene.get_selection_key(item) not in keys]
+        return
+    scene.select(items, add=get_flag(kwargs, 'add', 'tgl', default=False))
+
+
+@command
+def listRelatives(*args, **kwargs):
+    full_path = get_flag(kwargs, 'fullPath', 'f', default=False)
+    node_types = get_flag(kwargs, 'type', default=None)
+    if node_types is not None and not isinstance(node_types, (list, tuple)):
+        node_types = [node_types]
+
+    relatives = list()
+    for node, _, _ in resolve(args):
+        if get_flag(kwargs, 'parent', 'p'):
+            nodes = [node.parent] if node.parent is not None else list()
+        elif get_flag(kwargs, 'allDescendents', 'ad'):
+            nodes = list(iter_dag(node))[::-1]
+        else:
+            nodes = list(node.children)
+        if get_flag(kwargs, 'shapes', 's'):
+            nodes = [child for child in nodes if child.is_a('shape')]
+        if node_types is not None:
+            nodes = [child for child in nodes if any(child.is_a(node_type) for node_type in node_types)]
+        relatives.extend(scene.get_name(child, full_path) for child in nodes)
+    return relatives or None
+
+
+@command
+def listHistory(*args, **kwargs):
+    history = list()
+    for node, _, _ in resolve(args):
+        shapes = [node] if node.is_a('shape') else node.get_shapes()
+        for shape in shapes:
+            history.append(shape)
+            for skin_cluster in scene.get_skin_clusters(shape):
+                history.append(skin_cluster)
+                history.extend(skin_cluster.data['influences'])
+    return [scene.get_name(node) for node in history] or None
+
+
+@command
+def listConnections(*args, **kwargs):
+    source = get_flag(kwargs, 'source', 's', default=True)
+    destination = get_flag(kwargs, 'destination', 'd', default=True)
+    connections = get_flag(kwargs, 'connections', 'c', default=False)
+    plugs = get_flag(kwargs, 'plugs', 'p', default=False)
+
+    results = list()
+    for node, attr, _ in resolve(args):
+        pairs = list()
+        if source:
+            if attr is not None:
+                keys = [(node, attr)] if (node, attr) in scene.sources else list()
+            else:
+                keys = [key for key in scene.sources if key[0] is node]
+            pairs.extend((key, scene.sources[key]) for key in keys)
+        if destination:
+            if attr is not None:
+                keys = [(node, attr)]
+            else:
+                keys = [key for key in scene.destinations if key[0] is node]
+            pairs.extend((key, remote) for key in keys for remote in scene.destinations.get(key, list()))
+
+        for local, remote in pairs:
+            if connections:
+                results.append('{0}.{1}'.format(scene.get_name(local[0]), local[1]))
+            name = scene.get_name(remote[0])
+            results.append('{0}.{1}'.format(name, remote[1]) if plugs else name)
+    return results or None
+
+
+@command
+def connectAttr(source, destination, force=False, **kwargs):
+    source_node, source_attr, _ = scene.parse(source)
+    destination_node, destination_attr, _ = scene.parse(destination)
+    scene.connect((source_node, source_attr), (destination_node, destination_attr))
+
+
+@command
+def createNode(node_type, name=None, parent=None, skipSelect=False, **kwargs):
+    parent = scene.lookup(parent) if parent else None
+    node = scene.create(node_type, name=get_flag(kwargs, 'n', default=name), parent=parent)
+    if not skipSelect:
+        scene.select([(node, None, None)])
+    return scene.get_name(node)
+
+
+@command
+def getAttr(plug, **kwargs):
+    node, attr, _ = scene.parse(plug)
+    if attr is None:
+        raise RuntimeError('getAttr: \'{0}\' is not a plug.'.format(plug))
+    if get_flag(kwargs, 'lock', 'l'):
+        return attr in node.locked
+    return scene.get_value(node, attr)
+
+
+@command
+def setAttr(plug, *values, **kwargs):
+    node, attr, _ = scene.parse(plug)
+    if attr is None:
+        raise RuntimeError('setAttr: \'{0}\' is not a plug.'.format(plug))
+
+    lock = get_flag(kwargs, 'lock', 'l')
+    if lock is not None:
+        node.locked = node.locked | {attr} if lock else node.locked - {attr}
+    if not values:
+        return
+
+    if not scene.is_free(node, attr):
+        raise RuntimeError('setAttr: The attribute \'{0}\' is locked or connected and cannot be modified.'.format(plug))
+    scene.record_undo(SetAttrUndo(node, attr, scene.get_value(node, attr)[0] if attr in COMPOUNDS else node.attrs[attr]))
+    scene.set_value(node, attr, values if attr in COMPOUNDS else values[0])
+
+
+@command
+def attributeQuery(attr, node=None, exists=False, **kwargs):
+    if not exists:
+        raise RuntimeError('attributeQuery: only the exists query is supported.')
+    return get_attr_name(attr) in scene.lookup(node).attrs
+
+
+@command
+def addAttr(node, longName=None, dataType=None, **kwargs):
+    node = scene.lookup(node)
+    if longName in node.attrs:
+        raise RuntimeError('addAttr: Attribute \'{0}\' already exists.'.format(longName))
+    node.attrs[longName] = None
+
+
+@command
+def circle(*args, **kwargs):
+    radius = get_flag(kwargs, 'radius', 'r', default=1.0)
+    transform = scene.create('transform', name=get_flag(kwargs, 'name', 'n', default='nurbsCircle1'))
+    shape = scene.create('nurbsCurve', name='{0}Shape'.format(transform.name), parent=transform)
+    shape.data['points'] = [
+        (radius * math.cos(index * math.pi / 4.0), 0.0, radius * math.sin(index * math.pi / 4.0)) for index in range(8)
+    ]
+    scene.select([(transform, None, None)])
+    return [scene.get_name(transform)]
+
+
+@command
+def group(*args, **kwargs):
+    if not get_flag(kwargs, 'empty', 'em'):
+        raise RuntimeError('group: only empty groups are supported.')
+    node = scene.create('transform', name=get_flag(kwargs, 'name', 'n', default='group1'))
+    scene.select([(node, None, None)])
+    return scene.get_name(node)
+
+
+@command
+def joint(*args, **kwargs):
+    # The new joint goes under the selected joint, like in Maya
+    parents = [node for node, _, _ in scene.selection if node.is_a('joint')]
+    node = scene.create('joint', name=get_flag(kwargs, 'name', 'n', default='joint1'),
+                        parent=parents[0] if parents else None)
+    scene.select([(node, None, None)])
+    return scene.get_name(node)
+
+
+@command
+def parent(*args, **kwargs):
+    nodes = [node for node, _, _ in resolve(args)]
+    if get_flag(kwargs, 'world', 'w'):
+        children, new_parent = nodes, None
+    else:
+        children, new_parent = nodes[:-1], nodes[-1]
+    for child in children:
+        scene.reparent(child, new_parent)
+    return [scene.get_name(child) for child in children]
+
+
+@command
+def exactWorldBoundingBox(*args, **kwargs):
+    points = list()
+    for node, _, _ in resolve(args):
+        for shape in [node] + list(iter_dag(node)):
+            if shape.is_a('controlPoint') and not shape.attrs['intermediateObject']:
+                points.extend(scene.get_points(shape, world=True))
+    if not points:
+        return [0.0] * 6
+    return [min(point[axis] for point in points) for axis in range(3)] + \
+        [max(point[axis] for point in points) for axis in range(3)]
+
+
+@command
+def xform(*args, **kwargs):
+    world_space = get_flag(kwargs, 'worldSpace', 'ws', default=False)
+    translation = get_flag(kwargs, 'translation', 't')
+    node, _, _ = resolve(args)[0]
+
+    offset = scene.get_world_offset(node) if world_space else [0.0, 0.0, 0.0]
+    if get_flag(kwargs, 'q', 'query'):
+        return [node.attrs[attr] + value for attr, value in zip(('tx', 'ty', 'tz'), offset)]
+    if translation is not None:
+        for attr, value, parent_value in zip(('tx', 'ty', 'tz'), translation, offset):
+            node.attrs[attr] = value - parent_value
+    rotation = get_flag(kwargs, 'rotation', 'ro')
+    if rotation is not None:
+        for attr, value in zip(('rx', 'ry', 'rz'), rotation):
+            node.attrs[attr] = value
+
+
+@command
+def polyEvaluate(*args, **kwargs):
+    node, _, _ = resolve(args)[0]
+    shape = get_shape(node)
+    if get_flag(kwargs, 'vertex', 'v'):
+        return len(shape.data['points'])
+    if get_flag(kwargs, 'face', 'f'):
+        return len(shape.data['polygons'])
+    raise RuntimeError('polyEvaluate: only vertex and face counts are supported.')
+
+
+@command
+def sets(*args, **kwargs):
+    if get_flag(kwargs, 'q', 'query'):
+        object_set = scene.lookup(args[0])
+        return [scene.get_name(member) for member in object_set.data.get('members', list())] or None
+
+    name = get_flag(kwargs, 'name', 'n', default='set1')
+    object_set = scene.create('objectSet', name=name)
+    object_set.data['members'] = [node for node, _, _ in resolve(args)]
+    return scene.get_name(object_set)
+
+
+@command
+def controller(*args, **kwargs):
+    nodes = [node for node, _, _ in resolve(args)]
+    if get_flag(kwargs, 'isController', 'ic'):
+        destinations = scene.destinations.get((nodes[0], 'message'), list())
+        return any(attr == 'controllerObject' for _, attr in destinations)
+
+    for node in nodes:
+        tag = scene.create('controller', name='{0}_tag'.format(node.name))
+        scene.connect((node, 'message'), (tag, 'controllerObject'))
+
+
+@command
+def skinCluster(*args, **kwargs):
+    edit = get_flag(kwargs, 'e', 'edit')
+    query = get_flag(kwargs, 'q', 'query')
+    nodes = [node for node, _, _ in resolve(args)]
+
+    if edit or query:
+        target = nodes[0]
+        if target.is_a('skinCluster'):
+            skin_clusters = [target]
+        else:
+            skin_clusters = scene.get_skin_clusters(get_shape(target))
+        if not skin_clusters:
+            raise RuntimeError('skinCluster: \'{0}\' is not connected to a skinCluster.'.format(target.name))
+
+        skin_cluster = skin_clusters[0]
+        if query:
+            if get_flag(kwargs, 'influence', 'inf'):
+                return [scene.get_name(node) for node in skin_cluster.data['influences']]
+            if get_flag(kwargs, 'geometry', 'g'):
+                return [scene.get_name(skin_cluster.data['geometry'])]
+            raise RuntimeError('skinCluster: unsupported query.')
+
+        if get_flag(kwargs, 'unbind', 'ub'):
+            for node in skin_clusters:
+                scene.delete(node)
+            return
+
+        added = get_flag(kwargs, 'addInfluence', 'ai')
+        if added:
+            scene.add_influences(skin_cluster, [node for node, _, _ in resolve([added])])
+        removed = get_flag(kwargs, 'removeInfluence', 'ri')
+        if removed:
+            scene.remove_influences(skin_cluster, [node for node, _, _ in resolve([removed])])
+        return
+
+    influences = [node for node in nodes if node.is_a('joint')]
+    geometries = [get_shape(node) for node in nodes if not node.is_a('joint')]
+    name = get_flag(kwargs, 'name', 'n')
+    return [scene.get_name(scene.create_skin_cluster(shape, influences, name=name)) for shape in geometries]
+
+
+@command
+def copySkinWeights(source, destination, **kwargs):
+    """
+    Closest point copy between two skinned meshes, influences being associated by name.
+    """
+    from .api import OpenMaya
+
+    source_shape = get_shape(scene.lookup(source))
+    destination_shape = get_shape(scene.lookup(destination))
+    source_skin_cluster, = scene.get_skin_clusters(source_shape)
+    destination_skin_cluster, = scene.get_skin_clusters(destination_shape)
+
+    intersector = OpenMaya.MMeshIntersector().create(
+        OpenMaya.MObject(source_shape), OpenMaya.MDagPath(source_shape).inclusiveMatrix()
+    )
+    source_influences = [node.name for node in source_skin_cluster.data['influences']]
+    destination_influences = [node.name for node in destination_skin_cluster.data['influences']]
+    columns = [source_influences.index(name) if name in source_influences else None for name in destination_influences]
+
+    source_weights = source_skin_cluster.data['weights']
+    source_count = len(source_influences)
+    weights = list()
+    for point in scene.get_points(destination_shape, world=True):
+        point_on_mesh = intersector.getClosestPoint(OpenMaya.MPoint(*point))
+        vertices = source_shape.data['polygons'][point_on_mesh.face]
+        a, b, c = vertices[0], vertices[point_on_mesh.triangle + 1], vertices[point_on_mesh.triangle + 2]
+        u, v = point_on_mesh.barycentricCoords
+        w = 1.0 - u - v
+        for column in columns:
+            if column is None:
+                weights.append(0.0)
+            else:
+                weights.append(
+                    source_weights[a * source_count + column] * u +
+                    source_weights[b * source_count + column] * v +
+                    source_weights[c * source_count + column] * w
+                )
+    destination_skin_cluster.data['weights'] = weights
+
+
+@command
+def pluginInfo(name, **kwargs):
+    name = name.rpartition('/')[-1].rpartition('.py')[0] or name
+    if get_flag(kwargs, 'loaded', 'l'):
+        return name in scene.plugins
+    raise RuntimeError('pluginInfo: only the loaded query is supported.')
+
+
+@command
+def loadPlugin(path, quiet=False, **kwargs):
+    from .api import OpenMaya
+
+    name = path.replace('\\', '/').rpartition('/')[-1].rpartition('.py')[0]
+    if name not in scene.plugins:
+        scene.plugins[name] = OpenMaya.load_plugin(path)
+    return [name]
+
+
+@command
+def undoInfo(*args, **kwargs):
+    if get_flag(kwargs, 'openChunk', 'ock'):
+        scene.open_chunk()
+    elif get_flag(kwargs, 'closeChunk', 'cck'):
+        scene.close_chunk()
+    elif get_flag(kwargs, 'q', 'query'):
+        return True
+
+
+@command
+def undo(*args, **kwargs):
+    if not scene.undo():
+        raise RuntimeError('There are no more commands to undo.')
+
+
+@command
+def getPanel(*args, **kwargs):
+    if get_flag(kwargs, 'withFocus', 'wf'):
+        return scene.focus
+    if get_flag(kwargs, 'visiblePanels', 'vis'):
+        return [panel for panel, flags in sorted(scene.panels.items()) if flags['visible']]
+    if get_flag(kwargs, 'type', 'typ') == 'modelPanel':
+        return sorted(scene.panels)
+    return sorted(scene.panels)
+
+
+@command
+def modelEditor(panel, **kwargs):
+    if panel not in scene.panels:
+        raise RuntimeError('modelEditor: Object \'{0}\' not found.'.format(panel))
+
+    flags = scene.panels[panel]
+    query = get_flag(kwargs, 'q', 'query')
+    options = {flag: value for flag, value in kwargs.items() if flag not in ('q', 'query', 'e', 'edit')}
+    if query:
+        flag, = options
+        return flags.get(flag, False)
+    flags.update(options)
+
+
+@command
+def progressBar(*args, **kwargs):
+    if get_flag(kwargs, 'q', 'query'):
+        return False
+
+
+@command
+def evalDeferred(func, **kwargs):
+    scene.deferred.append(func)
+
+
+@command
+def refresh(*args, **kwargs):
+    pass
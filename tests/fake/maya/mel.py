@@ -0,0 +1,16 @@
+"""
+Fake of maya.mel, only the global variables and runtime commands used by the package are known.
+"""
+from .cmds import calls
+from ._scene import scene
+
+VARIABLES = {'$gMainProgressBar': 'MayaWindow|mainProgressBar', '$gMainWindow': 'MayaWindow'}
+
+
+def eval(command):
+    calls['mel.eval'] += 1
+    command = command.strip().rstrip(';')
+    if command.startswith('$tmp = '):
+        return VARIABLES.get(command[len('$tmp = '):].strip(), '')
+    scene.mel_commands.append(command)
+    return None
@@ -0,0 +1,11 @@
+"""
+Fake of maya.standalone, the in-memory scene needs no initialization.
+"""
+
+
+def initialize(name='python'):
+    pass
+
+
+def uninitialize():
+    pass
@@ -0,0 +1,151 @@
+"""
+Synthetic scenes built straight in the fake scene, without going through the counted cmds.
+"""
+from maya._scene import scene
+
+
+def create_hierarchy(count, branches=10, name='node'):
+    """
+    Create a DAG of transforms, each group holding `branches` children named alike so names repeat across groups.
+    :param count: int, number of transforms
+    :param branches: int
+    :param name: str, base name of the transforms
+    :return: list of Node
+    """
+    nodes = list()
+    parents = [None]
+    while len(nodes) < count:
+        next_parents = list()
+        for parent in parents:
+            for index in range(branches):
+                if len(nodes) >= count:
+                    break
+                node = scene.create('transform', name='{0}{1}'.format(name, index), parent=parent)
+                nodes.append(node)
+                next_parents.append(node)
+        parents = next_parents
+    return nodes
+
+
+def create_controllers(count, namespaces=('',), translate=1.0):
+    """
+    Create transforms tagged as controllers, moved away from their rest pose.
+    :param count: int, number of controllers per namespace
+    :param namespaces: list of str
+    :param translate: float, value set on every translate channel
+    :return: list of Node
+    """
+    ctrls = list()
+    for namespace in namespaces:
+        prefix = '{0}:'.format(namespace) if namespace else ''
+        group = scene.create('transform', name='{0}ctrls_grp'.format(prefix))
+        for index in range(count):
+            ctrl = scene.create('transform', name='{0}ctrl{1}_ctl'.format(prefix, index), parent=group)
+            for attr in ('tx', 'ty', 'tz'):
+                ctrl.attrs[attr] = translate
+            ctrl.attrs['sx'] = 2.0
+
+            tag = scene.create('controller', name='{0}ctrl{1}_tag'.format(prefix, index))
+            scene.connect((ctrl, 'message'), (tag, 'controllerObject'))
+            ctrls.append(ctrl)
+    return ctrls
+
+
+def create_grid(name, rows, columns, size=10.0, offset=(0.0, 0.0, 0.0), parent=None):
+    """
+    Create a planar quad mesh of (rows + 1) * (columns + 1) vertices in the XZ plane.
+    :return: tuple, (transform Node, mesh Node)
+    """
+    transform = scene.create('transform', name=name, parent=parent)
+    for attr, value in zip(('tx', 'ty', 'tz'), offset):
+        transform.attrs[attr] = value
+    shape = scene.create('mesh', name='{0}Shape'.format(name), parent=transform)
+
+    step_x = size / max(columns, 1)
+    step_z = size / max(rows, 1)
+    shape.data['points'] = [
+        (column * step_x - size / 2.0, 0.0, row * step_z - size / 2.0)
+        for row in range(rows + 1) for column in range(columns + 1)
+    ]
+    shape.data['polygons'] = [
+        (row * (columns + 1) + column, row * (columns + 1) + column + 1,
+         (row + 1) * (columns + 1) + column + 1, (row + 1) * (columns + 1) + column)
+        for row in range(rows) for column in range(columns)
+    ]
+    return transform, shape
+
+
+def create_joints(name, count, parent=None, spacing=1.0):
+    """
+    Create a chain of joints along X.
+    :return: list of Node
+    """
+    joints = list()
+    for index in range(count):
+        joint = scene.create('joint', name='{0}{1}_jnt'.format(name, index), parent=parent)
+        joint.attrs['tx'] = spacing if index else 0.0
+        joints.append(joint)
+        parent = joint
+    return joints
+
+
+def get_gradient_weights(points, count, size=10.0):
+    """
+    Weights blending two consecutive influences along X, so every point has two non-zero weights.
+    """
+    weights = [0.0] * (len(points) * count)
+    for index, (x, _, _) in enumerate(points):
+        position = min(max((x / size + 0.5) * (count - 1), 0.0), count - 1.0)
+        first = min(int(position), count - 2) if count > 1 else 0
+        blend = position - first
+        weights[index * count + first] = 1.0 - blend
+        if count > 1:
+            weights[index * count + first + 1] = blend
+    return weights
+
+
+def create_skinned_grid(name, rows, columns, joints, unused_joints=0, offset=(0.0, 0.0, 0.0)):
+    """
+    Create a grid skinned to the given joints with gradient weights, plus joints bound without any weight.
+    :param unused_joints: int, number of extra joints bound with zero weights
+    :return: tuple, (transform Node, mesh Node, skinCluster Node)
+    """
+    transform, shape = create_grid(name, rows, columns, offset=offset)
+    influences = list(joints) + create_joints('{0}_unused'.format(name), unused_joints)
+
+    weights = get_gradient_weights(shape.data['points'], len(joints))
+    if unused_joints:
+        count, total = len(joints), len(influences)
+        padded = [0.0] * (len(shape.data['points']) * total)
+        for index in range(count):
+            padded[index::total] = weights[index::count]
+        weights = padded
+
+    skin_cluster = scene.create_skin_cluster(shape, influences, weights, name='{0}_skinCluster'.format(name))
+    return transform, shape, skin_cluster
+
+
+def create_skeleton(name, count, chain_length=20):
+    """
+    Create `count` joints as chains of `chain_length` joints.
+    :return: list of Node
+    """
+    joints = list()
+    for index in range(0, count, chain_length):
+        joints.extend(create_joints('{0}{1}_'.format(name, index // chain_length), min(chain_length, count - index)))
+    return joints
+
+
+def create_set_dressing(count, name_count, group_size=1000, name='prop'):
+    """
+    Create `count` transforms in groups of `group_size`, cycling over `name_count` names so each name is used
+    count / name_count times across the groups.
+    :return: list of Node
+    """
+    nodes = list()
+    group = None
+    for index in range(count):
+        if not index % group_size:
+            group = scene.create('transform', name='set{0}'.format(index // group_size))
+        nodes.append(scene.create('transform', name='{0}{1}'.format(name, index % name_count), parent=group))
+    return nodes
@@ -0,0 +1,239 @@
+"""
+Benchmarks of the RigUtils and utils hot paths on synthetic scenes, with the number of calls made to each cmds
+command. The call counts must not grow with the scene, they are stored in the benchmark extra info.
+"""
+import pytest
+from maya import cmds
+from generators import create_hierarchy, create_controllers, create_skeleton, create_grid, create_skinned_grid, \
+    create_set_dressing, get_gradient_weights
+
+
+def run(benchmark, func, setup, rounds=3):
+    """
+    Benchmark func, rebuilding the scene before each round.
+    :return: dict, the cmds calls of the last round by command name
+    """
+    def reset():
+        cmds.file(new=True, force=True)
+        setup()
+        cmds.calls.clear()
+
+    benchmark.pedantic(func, setup=reset, rounds=rounds, iterations=1)
+    calls = dict(cmds.calls)
+    benchmark.extra_info['calls'] = calls
+    return calls
+
+
+def test_select_skinned_joints(benchmark, rig, scene):
+    def setup():
+        joints = create_skeleton('spine', 12000)
+        for index in range(20):
+            create_skinned_grid('body{0}'.format(index), 10, 10, joints[index * 600:(index + 1) * 600])
+        cmds.select('body*')
+        cmds.select('body0Shape.vtx[0:5]', add=True)
+
+    calls = run(benchmark, rig.RigUtils.select_skinned_joints, setup)
+
+    assert len(cmds.ls(sl=True)) == 12000
+    # One clear then one select per batch of 5000 joints
+    assert calls['select'] == 4
+    assert calls['ls'] == 1
+
+
+def test_print_non_unique_nodes(benchmark, rig, scene, capsys):
+    calls = run(benchmark, rig.RigUtils.print_non_unique_nodes, lambda: create_hierarchy(100000))
+
+    # Each round prints the ten names used by every group
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[-10:] == ['node{0} (10000)'.format(index) for index in range(10)]
+    assert scene.warnings == ['Your scene contains non-unique node names.']
+    assert calls == {'ls': 1, 'warning': 1}
+
+
+def test_get_non_unique_nodes(benchmark, rig, scene, tmp_path):
+    # 500k names, each used twice, built once as the scene is only read
+    create_set_dressing(500000, 250000)
+
+    # Counted per round, as the rounds run only once when benchmarks are disabled
+    report = benchmark.pedantic(rig.RigUtils.get_non_unique_nodes, setup=cmds.calls.clear, rounds=3, iterations=1)
+    benchmark.extra_info['calls'] = dict(cmds.calls)
+
+    assert len(report) == 250000
+    assert report['prop0'] == ['|set0|prop0', '|set250|prop0']
+    assert dict(cmds.calls) == {'ls': 1}
+
+    file_path = str(tmp_path / 'report.txt')
+    rig.RigUtils.write_non_unique_nodes(file_path, report)
+    with open(file_path) as f:
+        assert sum(1 for _ in f) == 250000 * 3
+
+
+def test_reset_ctrls_transforms(benchmark, rig, scene):
+    def setup():
+        create_controllers(2500, namespaces=('char1', 'char2'))
+
+    calls = run(benchmark, rig.resetSelectedMayaCtrlsTransforms, setup)
+
+    ctrls = [node for node in scene.iter_nodes() if node.name.endswith('_ctl')]
+    assert len(ctrls) == 5000
+    assert all(ctrl.attrs['tx'] == 0.0 and ctrl.attrs['sx'] == 1.0 for ctrl in ctrls)
+    # Every controller is reset by a single undoable command
+    assert calls['rigMenuModifier'] == 1
+    assert calls['listConnections'] == 1
+    assert calls['ls'] == 2
+
+
+def test_optimize_skin_clusters(benchmark, rig, scene):
+    def setup():
+        for index in range(100):
+            joints = create_skeleton('mesh{0}_'.format(index), 8)
+            create_skinned_grid('mesh{0}'.format(index), 10, 10, joints, unused_joints=4)
+
+    calls = run(benchmark, rig.RigUtils.optimize_skin_clusters, setup)
+
+    skin_clusters = [node for node in scene.iter_nodes() if node.is_a('skinCluster')]
+    assert len(skin_clusters) == 100
+    assert all(len(node.data['influences']) == 8 for node in skin_clusters)
+    # One call per skinCluster to remove its influences, the weights are read through the API
+    assert calls['skinCluster'] == 100
+    assert calls['ls'] == 1
+
+
+SKIN_CLUSTER_ATTRIBUTES = (
+    'skinningMethod', 'useComponents', 'deformUserNormals', 'dqsSupportNonRigid',
+    'dqsScaleX', 'dqsScaleY', 'dqsScaleZ', 'normalizeWeights', 'weightDistribution',
+    'maintainMaxInfluences', 'maxInfluences', 'envelope'
+)
+
+
+def transfer_skin_per_child():
+    """
+    Previous transfer_skin path, kept for comparison: history walk, one setAttr per attribute and one
+    copySkinWeights per child.
+    """
+    selection = cmds.ls(sl=True) or list()
+    parent = selection[0]
+    children = selection[1:]
+
+    history = cmds.listHistory(parent) or list()
+    parent_skin_cluster = [node for node in history if cmds.objectType(node, isAType='skinCluster')][0]
+    data = [(attr, cmds.getAttr('{0}.{1}'.format(parent_skin_cluster, attr))) for attr in SKIN_CLUSTER_ATTRIBUTES]
+    joints = sorted(cmds.skinCluster(parent_skin_cluster, q=True, influence=True))
+
+    for child in children:
+        if True in [cmds.objectType(node, isAType='skinCluster') for node in cmds.listHistory(child) or list()]:
+            cmds.skinCluster(child, e=True, unbind=True)
+
+        new_skin_cluster, = cmds.skinCluster(child, joints)
+        for attr, value in data:
+            cmds.setAttr('{0}.{1}'.format(new_skin_cluster, attr), value)
+
+        cmds.copySkinWeights(parent, child, noMirror=True, surfaceAssociation='closestPoint',
+                             influenceAssociation=('name', 'closestJoint'))
+
+    cmds.select(selection)
+
+
+def setup_transfer(rows):
+    joints = create_skeleton('leg', 10, chain_length=10)
+    create_skinned_grid('body', rows, rows, joints)
+    # A LOD already skinned to other influences and two unskinned ones
+    create_skinned_grid('lod0', rows, rows, joints[:2], offset=(0.0, 0.1, 0.0))
+    for index in range(1, 3):
+        create_grid('lod{0}'.format(index), rows, rows, offset=(0.0, 0.1, 0.0))
+    cmds.select('body', 'lod0', 'lod1', 'lod2')
+
+
+def check_transfer(scene):
+    assert not scene.warnings
+    for name in ('lod0', 'lod1', 'lod2'):
+        shape = scene.lookup('{0}Shape'.format(name))
+        skin_cluster, = scene.get_skin_clusters(shape)
+        count = len(skin_cluster.data['influences'])
+        assert count == 10
+
+        weights = skin_cluster.data['weights']
+        expected = get_gradient_weights(shape.data['points'], count)
+        assert all(abs(sum(weights[start:start + count]) - 1.0) < 1e-6 for start in range(0, len(weights), count))
+        assert max(abs(a - b) for a, b in zip(weights, expected)) < 0.1
+
+
+@pytest.mark.benchmark(group='transfer_skin')
+@pytest.mark.parametrize('rows', (10, 25, 50), ids=lambda rows: '{0}_vertices'.format((rows + 1) ** 2))
+def test_transfer_skin(benchmark, rig, scene, rows):
+    calls = run(benchmark, rig.RigUtils.transfer_skin, lambda: setup_transfer(rows))
+
+    check_transfer(scene)
+    # The source weights are read once, each child gets one skinCluster and one weights write
+    assert calls['skinCluster'] == 4
+    assert calls['getAttr'] == 12
+    assert calls['rigMenuModifier'] == 4
+    assert 'setAttr' not in calls
+
+
+@pytest.mark.benchmark(group='transfer_skin')
+@pytest.mark.parametrize('rows', (10, 25, 50), ids=lambda rows: '{0}_vertices'.format((rows + 1) ** 2))
+def test_transfer_skin_per_child(benchmark, scene, rows):
+    calls = run(benchmark, transfer_skin_per_child, lambda: setup_transfer(rows))
+
+    check_transfer(scene)
+    # One setAttr per attribute and one copySkinWeights per child
+    assert calls['setAttr'] == 36
+    assert calls['copySkinWeights'] == 3
+
+
+
+def interpolate_dense(weights, count, triangles):
+    """
+    Previous interpolation of SkinWeights.sample, kept for comparison: every influence of the triangle vertices is
+    interpolated from the dense weights.
+    """
+    influences = range(count)
+
+    values = list()
+    for (a, b, c), (u, v, w) in triangles:
+        a, b, c = a * count, b * count, c * count
+        values.extend([weights[a + i] * u + weights[b + i] * v + weights[c + i] * w for i in influences])
+    return values
+
+
+@pytest.fixture(scope='module', params=(50, 150, 300), ids=lambda rows: '{0}_vertices'.format((rows + 1) ** 2))
+def interpolation(request, rig):
+    """
+    A skinned grid of 100 influences and the center of each of its faces to interpolate the weights on. The closest
+    point queries are left out, so only the interpolation is timed. The scene is only read, it is built once.
+    """
+    rows = request.param
+    cmds.file(new=True, force=True)
+    joints = create_skeleton('spine', 100)
+    _, shape, skin_cluster = create_skinned_grid('body', rows, rows, joints)
+
+    source = rig.SkinWeights(skin_cluster.name)
+    third = 1.0 / 3.0
+    triangles = [(polygon[:3], (third, third, third)) for polygon in shape.data['polygons']]
+    return source, skin_cluster.data['weights'], triangles, rows
+
+
+def check_interpolation(source, triangles, values):
+    count = source.influence_count
+    assert len(values) == len(triangles) * count
+    assert all(abs(sum(values[start:start + count]) - 1.0) < 1e-6 for start in range(0, len(values), count))
+
+
+@pytest.mark.benchmark(group='interpolate_weights')
+def test_interpolate_weights(benchmark, interpolation):
+    source, weights, triangles, rows = interpolation
+    values = benchmark.pedantic(source.interpolate, args=(triangles,), rounds=3 if rows < 300 else 1, iterations=1)
+
+    check_interpolation(source, triangles, values)
+    expected = interpolate_dense(weights, source.influence_count, triangles)
+    assert max(abs(a - b) for a, b in zip(values, expected)) < 1e-9
+
+
+@pytest.mark.benchmark(group='interpolate_weights')
+def test_interpolate_weights_dense(benchmark, interpolation):
+    source, weights, triangles, rows = interpolation
+    values = benchmark.pedantic(interpolate_dense, args=(weights, source.influence_count, triangles),
+                                rounds=3 if rows < 300 else 1, iterations=1)
+
+    check_interpolation(source, triangles, values)
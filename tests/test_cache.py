@@ -0,0 +1,27 @@
+from maya.api import OpenMaya
+from generators import create_skeleton, create_skinned_grid
+
+
+def test_object_map_tells_colliding_hash_codes_apart(rig, scene, monkeypatch):
+    monkeypatch.setattr(OpenMaya.MObjectHandle, 'hashCode', lambda self: 0)
+    first, second = [OpenMaya.MObject(scene.create('transform')) for _ in range(2)]
+
+    object_map = rig.cache.ObjectMap()
+    object_map[first] = 'first'
+    object_map.setdefault(second, list()).append('second')
+
+    assert len(object_map) == 2
+    assert object_map.get(first) == 'first'
+    assert object_map.get(second) == ['second']
+    assert OpenMaya.MObject(scene.create('transform')) not in object_map
+
+
+def test_skin_index_resolves_shapes_and_transforms(rig, scene, monkeypatch):
+    monkeypatch.setattr(OpenMaya.MObjectHandle, 'hashCode', lambda self: 0)
+    joints = create_skeleton('leg', 2)
+    for name in ('body', 'head'):
+        create_skinned_grid(name, 1, 1, joints)
+
+    assert rig.SkinIndex.get_skin_clusters('body') == ['body_skinCluster']
+    assert rig.SkinIndex.get_skin_clusters('headShape') == ['head_skinCluster']
+    assert rig.SkinIndex.get_skin_clusters('leg0_0_jnt') == list()
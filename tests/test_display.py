@@ -0,0 +1,45 @@
+import pytest
+from generators import create_grid
+
+
+@pytest.fixture
+def geometry(scene):
+    root = scene.create('transform', name='geometry')
+    shapes = [create_grid('body{0}'.format(index), 2, 2, parent=root)[1] for index in range(3)]
+    return root, shapes
+
+
+def test_get_modeling_state_includes_descendants(rig, geometry):
+    root, shapes = geometry
+    shapes[1].attrs['overrideEnabled'] = True
+
+    state = rig.RigUtils.get_modeling_state()
+
+    assert len(state) == 7
+    assert state['|geometry'] == [False, 0]
+    assert state['|geometry|body1|body1Shape'] == [True, 0]
+
+
+def test_set_geometry_lock_counts_changed_nodes(rig, geometry):
+    root, shapes = geometry
+    shapes[0].attrs['overrideEnabled'] = True
+
+    assert rig.set_geometry_lock('geometry', True) == (2, False)
+    assert (root.attrs['overrideEnabled'], root.attrs['overrideDisplayType']) == (True, 2)
+    assert not shapes[0].attrs['overrideEnabled']
+
+    # Nothing left to change
+    assert rig.set_geometry_lock('geometry', True) == (0, False)
+
+
+def test_set_geometry_lock_skips_locked_nodes(rig, scene, geometry):
+    root, shapes = geometry
+    for shape in shapes:
+        shape.attrs['overrideEnabled'] = True
+    shapes[2].locked = frozenset(['overrideDisplayType'])
+
+    assert rig.set_geometry_lock('geometry', True) == (3, False)
+    assert scene.warnings == ['Unable to set override to \'body2Shape\'.']
+    # A node with a locked plug is left untouched
+    assert shapes[2].attrs['overrideEnabled']
+
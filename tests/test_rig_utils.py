@@ -0,0 +1,90 @@
+from maya import cmds
+from generators import create_controllers, create_joints, create_grid, create_skinned_grid
+
+
+def test_audit_control_sets_queries_each_set_once(rig, scene):
+    create_controllers(10)
+    extra = scene.create('transform', name='extra')
+    nested = cmds.sets(['ctrl{0}_ctl'.format(index) for index in range(5, 10)], name='FaceSet')
+    cmds.sets(['ctrl{0}_ctl'.format(index) for index in range(4)] + [nested, extra.name], name='ControlSet')
+    cmds.calls.clear()
+
+    report = rig.RigUtils.audit_control_sets(['ControlSet'])
+
+    assert report == {'ControlSet': {'missing': ['ctrl4_ctl'], 'extra': ['extra']}}
+    # One members query and one set split per set, plus the controllers lookup
+    assert cmds.calls['sets'] == 2
+    assert cmds.calls['ls'] == 3
+
+
+def test_reset_ctrls_transforms_resets_keyed_channels(rig, scene):
+    keyed, driven, locked = create_controllers(3)
+    curve = scene.create('animCurveTL', name='ctrl0_ctl_translateX')
+    scene.connect((curve, 'output'), (keyed, 'tx'))
+    scene.connect((scene.lookup('ctrls_grp'), 'tx'), (driven, 'tx'))
+    locked.locked = frozenset(['translate'])
+
+    rig.resetSelectedMayaCtrlsTransforms()
+
+    # Keyed channels are reset like setAttr would, driven and locked ones are left alone
+    assert keyed.attrs['tx'] == 0.0
+    assert driven.attrs['tx'] == 1.0 and driven.attrs['ty'] == 0.0
+    assert locked.attrs['tx'] == 1.0 and locked.attrs['sx'] == 1.0
+    assert cmds.calls['rigMenuModifier'] == 1
+
+
+def test_lock_rig_optimizes_skin_clusters_after_a_weights_edit(rig, scene, capsys):
+    # The first lock records the fingerprints, the influences alone don't change with the weights edit
+    joints = create_joints('arm', 3)
+    _, _, skin_cluster = create_skinned_grid('body', 4, 4, joints)
+    rig.RigUtils.lock_rig()
+    assert len(skin_cluster.data['influences']) == 3
+
+    # Move the weights of the last joint to the previous one, the influences themselves are unchanged
+    weights = skin_cluster.data['weights']
+    for start in range(0, len(weights), 3):
+        weights[start + 1] += weights[start + 2]
+        weights[start + 2] = 0.0
+    capsys.readouterr()
+    rig.RigUtils.lock_rig()
+
+    assert [influence.name for influence in skin_cluster.data['influences']] == ['arm0_jnt', 'arm1_jnt']
+    assert 'body_skinCluster: 1 unused influence(s) removed.' in capsys.readouterr().out.splitlines()
+
+
+def test_create_global_local_ctrls_from_groups_resolves_skin_clusters_once(rig, scene):
+    root = scene.create('transform', name='geometry')
+    for index in range(6):
+        group = scene.create('transform', name='prop{0}_grp'.format(index), parent=root)
+        for part in range(2):
+            create_grid('prop{0}_part{1}'.format(index, part), 1, 1, offset=(index * 20.0, 0.0, 0.0), parent=group)
+    # Half of the props are already skinned
+    for index in range(0, 6, 2):
+        shape = scene.lookup('prop{0}_part0Shape'.format(index))
+        scene.create_skin_cluster(shape, create_joints('prop{0}_root'.format(index), 1))
+    cmds.calls.clear()
+
+    rig.RigUtils.create_global_local_ctrls_from_groups()
+
+    for index in range(6):
+        assert scene.lookup('prop{0}_global_C0_srt'.format(index)).attrs['tx'] == index * 20.0
+        for part in range(2):
+            skin_cluster, = scene.get_skin_clusters(scene.lookup('prop{0}_part{1}Shape'.format(index, part)))
+            assert skin_cluster.data['influences'][-1].name == 'prop{0}_local_C0_jnt'.format(index)
+    # The selection, one pass for the used indices, one per group for its meshes and one to index the
+    # skinClusters, however many binds invalidate that index afterwards
+    assert cmds.calls['ls'] == 6 + 3
+    assert cmds.calls['skinCluster'] == 12
+
+
+def test_controller_tools_warn_without_tagged_controllers(rig, scene, capsys):
+    # Untagged transforms aren't controllers
+    scene.create('transform', name='arm_ctl')
+    warning = 'No controllers found in the scene. To define controllers please use Control > Tag As Controller.'
+
+    rig.RigUtils.select_ctrls()
+    assert scene.warnings == [warning]
+
+    rig.RigUtils.lock_rig()
+    assert scene.warnings == [warning] * 2
+    assert 'lock_all_vis_attrs_on_ctrls: nothing to process, skipped.' in capsys.readouterr().out.splitlines()
@@ -0,0 +1,83 @@
+import pytest
+from maya import cmds
+from generators import create_skeleton, create_grid, create_skinned_grid
+
+
+@pytest.fixture
+def skin(rig):
+    return rig.skin
+
+
+def test_read_weights_empty_file(skin, tmp_path):
+    file_path = tmp_path / 'empty.rmsw'
+    file_path.write_bytes(b'')
+    assert skin.read_weights(str(file_path)) == (None, 0, None)
+
+
+def test_read_weights_truncated_file(skin, scene, tmp_path):
+    joints = create_skeleton('leg', 4)
+    create_skinned_grid('body', 4, 4, joints)
+    file_path = tmp_path / 'body.rmsw'
+    assert skin.export_weights('body_skinCluster', str(file_path)) == 25
+
+    # Only the non-zero weights are stored and read back, as CSR arrays
+    metadata, vertex_count, (offsets, indices, values) = skin.read_weights(str(file_path))
+    assert (vertex_count, len(metadata['influences'])) == (25, 4)
+    assert len(offsets) == 26 and offsets[-1] == len(indices) == len(values) == 40
+
+    data = file_path.read_bytes()
+    for size in (3, 10, len(data) - 1):
+        file_path.write_bytes(data[:size])
+        assert skin.read_weights(str(file_path)) == (None, 0, None)
+
+
+def test_import_weights_zeroes_unlisted_influences_and_undoes(skin, scene, tmp_path):
+    joints = create_skeleton('leg', 4)
+    _, _, source_skin_cluster = create_skinned_grid('body', 4, 4, joints)
+    file_path = str(tmp_path / 'body.rmsw')
+    skin.export_weights('body_skinCluster', file_path)
+
+    # Same topology bound to one more influence, fully weighted to it
+    extra, = create_skeleton('extra', 1)
+    _, shape = create_grid('lod', 4, 4)
+    skin_cluster = scene.create_skin_cluster(shape, [extra] + joints, name='lod_skinCluster')
+    old_weights = list(skin_cluster.data['weights'])
+
+    assert skin.import_weights('lod', file_path) == 'lod_skinCluster'
+
+    weights = skin_cluster.data['weights']
+    assert not any(weights[0::5])
+    for index in range(4):
+        assert weights[index + 1::5] == pytest.approx(source_skin_cluster.data['weights'][index::4], abs=1e-6)
+
+    # The weights write is one undoable command
+    cmds.undo()
+    assert skin_cluster.data['weights'] == old_weights
+
+
+def create_skinned_curve(scene, name, joints, weights):
+    transform = scene.create('transform', name=name)
+    shape = scene.create('nurbsCurve', name='{0}Shape'.format(name), parent=transform)
+    shape.data['points'] = [(float(index), 0.0, 0.0) for index in range(len(weights) // len(joints))]
+    return scene.create_skin_cluster(shape, joints, weights, name='{0}_skinCluster'.format(name))
+
+
+def test_optimize_skin_clusters_on_curve(rig, scene):
+    joints = create_skeleton('tail', 3)
+    skin_cluster = create_skinned_curve(scene, 'tail', joints, [1.0, 0.0, 0.0, 0.5, 0.5, 0.0, 0.0, 1.0, 0.0])
+
+    rig.RigUtils.optimize_skin_clusters()
+
+    assert [joint.name for joint in skin_cluster.data['influences']] == ['tail0_0_jnt', 'tail0_1_jnt']
+
+
+def test_transfer_skin_from_curve_warns(rig, scene):
+    joints = create_skeleton('tail', 2)
+    create_skinned_curve(scene, 'tail', joints, [1.0, 0.0, 0.0, 1.0])
+    create_grid('body', 1, 1)
+    cmds.select('tail', 'body')
+
+    rig.RigUtils.transfer_skin()
+
+    assert scene.warnings == ['The skin of \'tail\' can\'t be sampled, it is not a mesh.']
+    assert not scene.get_skin_clusters(scene.lookup('bodyShape'))
@@ -0,0 +1,31 @@
+import pytest
+from maya import cmds
+
+
+@pytest.fixture
+def panels(rig, scene):
+    rig.ModelPanels._views_count = None
+    yield scene.panels
+    scene.focus = 'modelPanel4'
+    for name, flags in scene.panels.items():
+        flags['visible'] = name == 'modelPanel4'
+
+
+def test_toggle_reads_the_focused_panel(rig, scene, panels):
+    panels['modelPanel3']['visible'] = True
+    cmds.modelEditor('modelPanel3', e=True, wos=True)
+    scene.focus = 'modelPanel3'
+
+    rig.ModelPanels.toggle('wos')
+
+    assert all(not flags['wos'] for flags in panels.values())
+
+
+def test_toggle_falls_back_on_the_first_visible_panel(rig, scene, panels):
+    cmds.modelEditor('modelPanel4', e=True, wos=True)
+    # The focus is on a panel which is not a model panel
+    scene.focus = 'outlinerPanel1'
+
+    rig.ModelPanels.toggle('wos')
+
+    assert all(not flags['wos'] for flags in panels.values())
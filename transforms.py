@@ -0,0 +1,142 @@
+from maya import cmds
+from maya.api import OpenMaya
+from .modifiers import apply_modifier
+from .cache import ObjectMap
+
+IDENTITY = (
+    (('tx', 'ty', 'tz'), 0.0),
+    (('rx', 'ry', 'rz'), 0.0),
+    (('sx', 'sy', 'sz'), 1.0),
+    (('shxy', 'shxz', 'shyz'), 0.0),
+)
+
+
+def get_children(parent):
+    """
+    :param parent: MObject, a transform or the world
+    :return: list of MObject
+    """
+    fn = OpenMaya.MFnDagNode(parent)
+    return [fn.child(index) for index in range(fn.childCount())]
+
+
+def get_residual_matrix(path):
+    """
+    Get the local matrix a node keeps once its translate, rotate, scale, shear and joint orient are reset: the
+    rotate axis and pivots of a transform, the rotate axis of a joint whose inverse scale is reset too.
+    :param path: MDagPath
+    :return: MMatrix
+    """
+    fn = OpenMaya.MFnTransform(path)
+    if path.hasFn(OpenMaya.MFn.kJoint):
+        return fn.rotateOrientation(OpenMaya.MSpace.kTransform).asMatrix()
+
+    matrix = fn.transformation()
+    matrix.setTranslation(OpenMaya.MVector(), OpenMaya.MSpace.kTransform)
+    matrix.setRotation(OpenMaya.MEulerRotation())
+    matrix.setScale((1.0, 1.0, 1.0), OpenMaya.MSpace.kTransform)
+    matrix.setShear((0.0, 0.0, 0.0), OpenMaya.MSpace.kTransform)
+    return matrix.asMatrix()
+
+
+def create_offset_groups(nodes, suffix='_rst'):
+    """
+    Insert a group above each node. The node's transform is reset and the group takes what makes up the
+    difference with its former local matrix, so nothing moves. Every group is created, named, reparented and set
+    in one undoable MDagModifier, then the original sibling order is restored.
+    :param nodes: list of transforms
+    :param suffix: str, groups are named <node><suffix><number>
+    :return: list, the groups
+    """
+    selection = OpenMaya.MSelectionList()
+    for node in nodes:
+        selection.add(node)
+
+    # Find the used group names in one pass
+    names = [node.rpartition('|')[-1] for node in nodes]
+    patterns = ['{0}{1}*'.format(name, suffix) for name in names]
+    used_names = {node.rpartition('|')[-1] for node in cmds.ls(patterns) or list()}
+
+    modifier = OpenMaya.MDagModifier()
+    groups = ObjectMap()
+    parents = ObjectMap()
+    world_matrices = list()
+    for index, name in enumerate(names):
+        path = selection.getDagPath(index)
+        node = path.node()
+
+        node_fn = OpenMaya.MFnDependencyNode(node)
+        attributes = [attr for attrs, _ in IDENTITY for attr in attrs]
+        if path.hasFn(OpenMaya.MFn.kJoint):
+            attributes += ['jox', 'joy', 'joz']
+        plugs = {attr: node_fn.findPlug(attr, False) for attr in attributes}
+        if [plug for plug in plugs.values() if plug.isFreeToChange() != OpenMaya.MPlug.kFreeToChange]:
+            cmds.warning('The transform of \'{0}\' is locked or connected, it has been skipped.'.format(name))
+            continue
+
+        parent = OpenMaya.MFnDagNode(path).parent(0)
+        parents[parent] = parent
+        world_matrices.append((node, path.inclusiveMatrix()))
+
+        # The group takes the local matrix of the node, less what the node keeps once reset
+        local_matrix = path.inclusiveMatrix() * path.exclusiveMatrixInverse()
+        local_matrix = OpenMaya.MTransformationMatrix(get_residual_matrix(path).inverse() * local_matrix)
+        translation = local_matrix.translation(OpenMaya.MSpace.kTransform)
+        rotation = local_matrix.rotation()
+        values = (
+            (translation.x, translation.y, translation.z),
+            (rotation.x, rotation.y, rotation.z),
+            local_matrix.scale(OpenMaya.MSpace.kTransform),
+            local_matrix.shear(OpenMaya.MSpace.kTransform),
+        )
+
+        number = 1
+        while '{0}{1}{2}'.format(name, suffix, number) in used_names:
+            number += 1
+        group_name = '{0}{1}{2}'.format(name, suffix, number)
+        used_names.add(group_name)
+
+        group = modifier.createNode('transform', OpenMaya.MObject.kNullObj if parent.hasFn(OpenMaya.MFn.kWorld) else parent)
+        modifier.renameNode(group, group_name)
+        modifier.reparentNode(node, group)
+
+        group_fn = OpenMaya.MFnDependencyNode(group)
+        for (attrs, _), vector in zip(IDENTITY, values):
+            for attr, value in zip(attrs, vector):
+                modifier.newPlugValueDouble(group_fn.findPlug(attr, False), value)
+
+        # The node is reset, jointOrient included
+        defaults = {attr: default for attrs, default in IDENTITY for attr in attrs}
+        for attr, plug in plugs.items():
+            modifier.newPlugValueDouble(plug, defaults.get(attr, 0.0))
+
+        # A joint under a group no longer compensates a parent joint scale, as cmds.parent would do
+        if path.hasFn(OpenMaya.MFn.kJoint):
+            inverse_scale = node_fn.findPlug('inverseScale', False)
+            if inverse_scale.isDestination:
+                modifier.disconnect(inverse_scale.source(), inverse_scale)
+            for attr in ('isx', 'isy', 'isz'):
+                modifier.newPlugValueDouble(node_fn.findPlug(attr, False), 1.0)
+
+        groups[node] = group
+
+    if not groups:
+        return list()
+
+    orders = [get_children(parent) for parent in parents.values()]
+    apply_modifier(modifier)
+
+    # Put each group where its node was among its siblings, moving back the siblings from the first group on
+    for children in orders:
+        first = min(index for index, child in enumerate(children) if child in groups)
+        children = [groups.get(child, child) for child in children[first:]]
+        cmds.reorder([OpenMaya.MFnDagNode(child).fullPathName() for child in children], back=True)
+
+    moved = [
+        OpenMaya.MFnDagNode(node).partialPathName() for node, matrix in world_matrices
+        if not OpenMaya.MDagPath.getAPathTo(node).inclusiveMatrix().isEquivalent(matrix, 1e-5)
+    ]
+    if moved:
+        cmds.warning('{0} node(s) moved while inserting their group: {1}'.format(len(moved), ', '.join(moved)))
+
+    return [OpenMaya.MFnDagNode(group).fullPathName() for group in groups.values()]
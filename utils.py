@@ -1,4 +1,7 @@
 from maya import cmds
+from .modifiers import AttributeWriter
+from .display import JointDisplay
+from .controllers import ControllerRegistry, NO_CONTROLLERS_WARNING
 
 
 def resetSelectedMayaCtrlsTransforms():
@@ -15,37 +18,38 @@ def resetSelectedMayaCtrlsTransforms():
     }
 
     selection = cmds.ls(sl=True)
-    ctrls = cmds.controller(q=True, allControllers=True)
+    ctrls = ControllerRegistry.get_all()
 
     if not ctrls:
-        cmds.warning('No controllers found in the scene. {}'.format(hint))
+        cmds.warning(NO_CONTROLLERS_WARNING)
         return
     elif not selection:
         selectedCtrls = ctrls
     else:
-        selectedCtrls = set(ctrls).intersection(selection)
+        selectedCtrls = ControllerRegistry.get_selected(selection)
 
         if not selectedCtrls:
             cmds.warning('No controllers selected. {}'.format(hint))
             return
 
-    for ctrl in selectedCtrls:
-        for attr, defaultValue in attributes.items():
-            plug = '{}.{}'.format(ctrl, attr)
-
-            try:
-                cmds.setAttr(plug, defaultValue)
-            except RuntimeError:
-                pass
+    # Locked and driven plugs are skipped by the writer, keyed ones are reset like setAttr would
+    with AttributeWriter() as writer:
+        for ctrl in selectedCtrls:
+            for attr, defaultValue in attributes.items():
+                writer.set('{}.{}'.format(ctrl, attr), defaultValue)
 
 
 def toggleJointsLocalAxis():
-    joints = cmds.ls(sl=True, type='joint') or cmds.ls(type='joint')
+    """
+    Toggle the local axis display of the selected joints. If no joint is selected, the joints of the characters
+    (namespaces) of the selection are toggled, or every joint if nothing is selected.
+    :return:
+    """
+    joints = JointDisplay.get_target_joints()
 
     if not joints:
         cmds.warning('No joints found.')
+        return
 
     currentState = cmds.getAttr('{}.displayLocalAxis'.format(joints[0]))
-
-    for joint in joints:
-        cmds.setAttr('{}.displayLocalAxis'.format(joint), not currentState)
+    JointDisplay.set_local_axis(joints, not currentState)
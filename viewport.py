@@ -0,0 +1,54 @@
+from maya import cmds
+
+
+class ModelPanels(object):
+    """
+    Model panels of the session, discovered once and refreshed when the number of 3d views changes.
+    """
+    _panels = list()
+    _views_count = None
+
+    @classmethod
+    def get(cls):
+        from maya.api import OpenMayaUI
+
+        views_count = OpenMayaUI.M3dView.numberOf3dViews()
+        if views_count != cls._views_count:
+            cls._panels = cmds.getPanel(type='modelPanel') or list()
+            cls._views_count = views_count
+        return list(cls._panels)
+
+    @classmethod
+    def get_active(cls, panels):
+        """
+        Get the model panel the user is looking at: the focused one, or the first visible one.
+        :param panels: list, the model panels
+        :return: str
+        """
+        panel = cmds.getPanel(withFocus=True)
+        if panel in panels:
+            return panel
+
+        visible_panels = [panel for panel in cmds.getPanel(visiblePanels=True) or list() if panel in panels]
+        return visible_panels[0] if visible_panels else panels[0]
+
+    @classmethod
+    def toggle(cls, flag, *linked_flags):
+        """
+        Flip a modelEditor flag on every model panel from the state of the active one so they all stay in sync.
+        :param flag: str, modelEditor flag the state is read from
+        :param linked_flags: str, flags set to the same state in the same call
+        :return:
+        """
+        panels = cls.get()
+        if not panels:
+            return
+
+        state = not cmds.modelEditor(cls.get_active(panels), q=True, **{flag: True})
+        flags = dict.fromkeys((flag,) + linked_flags, state)
+        for panel in panels:
+            try:
+                cmds.modelEditor(panel, e=True, **flags)
+            except RuntimeError:
+                # The panel has been deleted since the last discovery
+                cls._views_count = None